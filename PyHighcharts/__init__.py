@@ -1,3 +1,4 @@
 from highcharts.chart import Highchart, Highstock
+from highcharts.batch import render_many, iter_render_many
 
 from plt_pandas.plotdf import createLineChart, createScatterChart, createBarChart, createBoxChart, createColumnChart, createStockChart, MultiChart
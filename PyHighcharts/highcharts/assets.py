@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+""" PyHighcharts assets.py
+Offline pages: the jQuery / Highcharts scripts served from a local
+directory instead of the CDN.
+
+Scripts are looked up in the asset directory by the file name of their
+CDN URL (jquery.min.js, highcharts.js, ...), read once per process and
+either inlined into the page or copied next to it under a name holding
+their content hash, so every report written to the same place shares one
+browser cached file. The directory defaults to $PYHIGHCHARTS_ASSETS.
+"""
+from PyHighcharts.highcharts.encoders import write_atomic
+
+# Stdlib Imports
+import hashlib, os
+
+BUNDLE_MODES = ('inline', 'reference')
+
+# Subdirectory of the output directory receiving referenced scripts
+ASSET_SUBDIR = "assets"
+
+INLINE_SCRIPT = "<script type='text/javascript'>\n%s\n</script>"
+SCRIPT_REFERENCE = "<script type='text/javascript' src='%s'></script>"
+
+
+class Asset(object):
+    """ One Script Read From The Asset Directory """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as asset_file:
+            self.content = asset_file.read()
+        self.digest = hashlib.sha1(self.content).hexdigest()
+
+    def hashed_name(self):
+        """ File Name Carrying The Content Hash: name.<hash>.js """
+        stem, ext = os.path.splitext(os.path.basename(self.path))
+        return "%s.%s%s" % (stem, self.digest[:12], ext)
+
+
+class AssetCache(object):
+    """ Scripts Of One Or More Asset Directories, Each Read Once """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.assets = {}
+
+    def get(self, url, directory=None):
+        """ The Asset Standing In For The Script At url """
+        directory = directory or self.directory
+        if not directory:
+            raise ValueError("No Asset Directory: Pass One Or Set $PYHIGHCHARTS_ASSETS")
+        path = os.path.join(directory, url.rsplit('/', 1)[-1])
+        asset = self.assets.get(path)
+        if asset is None:
+            if not os.path.isfile(path):
+                raise ValueError("Missing Asset: %s" % path)
+            asset = self.assets[path] = Asset(path)
+        return asset
+
+    def clear(self):
+        """ Forget Every Loaded Asset """
+        self.assets.clear()
+
+    def headers(self, urls, mode, temp_dir='.', directory=None):
+        """ Script Tags Loading urls From The Asset Directory
+
+        'inline' embeds the scripts, 'reference' copies each one (if not
+        there yet) to <temp_dir>/assets under its hashed name and links it.
+        """
+        if mode not in BUNDLE_MODES:
+            raise ValueError("Bundle Mode Must Be One Of: %s" % (BUNDLE_MODES,))
+        tags = []
+        for url in urls:
+            asset = self.get(url, directory)
+            if mode == 'inline':
+                # A literal </script> would end the tag early
+                tags.append(INLINE_SCRIPT % asset.content.replace("</script", "<\\/script"))
+                continue
+            name = asset.hashed_name()
+            target_dir = os.path.join(temp_dir, ASSET_SUBDIR)
+            target = os.path.join(target_dir, name)
+            if not os.path.exists(target):
+                if not os.path.isdir(target_dir):
+                    os.makedirs(target_dir)
+                write_atomic(target, asset.content)
+            tags.append(SCRIPT_REFERENCE % ("%s/%s" % (ASSET_SUBDIR, name)))
+        return "\n".join(tags)
+
+
+ASSETS = AssetCache(os.environ.get('PYHIGHCHARTS_ASSETS'))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+""" PyHighcharts batch.py
+Render and write many independent charts across a process or thread pool.
+"""
+# Stdlib Imports
+import collections, multiprocessing, os, traceback
+from itertools import izip
+from multiprocessing.pool import ThreadPool
+
+RenderResult = collections.namedtuple('RenderResult', ['index', 'path', 'error'])
+
+# Seconds between checks for finished charts when results are unordered
+POLL_INTERVAL = 0.01
+
+
+def render_job(job):
+    """ Build (if needed), render and write one chart inside a worker """
+    index, chart, path, write_kwargs = job
+    try:
+        if not hasattr(chart, 'write'):
+            chart = chart()
+        temp_dir, fname = os.path.split(path)
+        chart.write(temp_dir or '.', fname, **write_kwargs)
+        return RenderResult(index, path, None)
+    except Exception:
+        # Tracebacks pickle, arbitrary exceptions may not
+        return RenderResult(index, path, traceback.format_exc())
+
+
+def iter_render_many(charts, paths, workers=None, threads=False, ordered=True,
+                     max_in_flight=None, **write_kwargs):
+    """ Render charts to paths on a pool, yielding a RenderResult per chart
+
+    charts holds Highchart / Highstock objects or callables building one;
+    with processes (the default) both must be picklable, so callables have
+    to be module level functions. Results come back in input order, or as
+    they complete when ordered is False; error holds the traceback of a
+    failed chart, including charts that could not be sent to a worker
+    (e.g. unpicklable ones). At most max_in_flight charts (default: twice the
+    worker count) are queued at a time, so neither inputs nor rendered
+    output pile up. Extra keyword arguments go to Highchart.write.
+    """
+    pool = ThreadPool(workers) if threads else multiprocessing.Pool(workers)
+    if max_in_flight is None:
+        max_in_flight = 2 * (workers or multiprocessing.cpu_count())
+    # (index, path, AsyncResult or None, submission error or None)
+    in_flight = collections.deque()
+
+    def result_of(entry):
+        index, path, pending, error = entry
+        if pending is not None:
+            try:
+                # Only failures outside render_job (pickling, a dead
+                # worker, ...) raise here
+                return pending.get()
+            except Exception:
+                error = traceback.format_exc()
+        return RenderResult(index, path, error)
+
+    def next_result():
+        if ordered:
+            return result_of(in_flight.popleft())
+        while True:
+            for entry in in_flight:
+                if entry[2] is None or entry[2].ready():
+                    in_flight.remove(entry)
+                    return result_of(entry)
+            in_flight[0][2].wait(POLL_INTERVAL)
+
+    try:
+        for index, (chart, path) in enumerate(izip(charts, paths)):
+            job = (index, chart, path, write_kwargs)
+            try:
+                in_flight.append((index, path,
+                    pool.apply_async(render_job, (job,)), None))
+            except Exception:
+                in_flight.append((index, path, None, traceback.format_exc()))
+            while len(in_flight) >= max_in_flight:
+                yield next_result()
+        while in_flight:
+            yield next_result()
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def render_many(charts, paths, **kwargs):
+    """ Render charts to paths on a pool, returns the list of RenderResults
+
+    Takes the same arguments as iter_render_many.
+    """
+    return list(iter_render_many(charts, paths, **kwargs))
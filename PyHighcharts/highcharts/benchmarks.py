@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+""" PyHighcharts: benchmarks.py
+Memory And Speed Benchmarks Of The Chart Objects
+"""
+from PyHighcharts.highcharts.chart import Highchart
+import sys, timeit
+
+
+def instance_state(obj):
+    """ Values Held By An Object's __dict__ And Slots """
+    state = dict(getattr(obj, '__dict__', {}))
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if hasattr(obj, name):
+                state[name] = getattr(obj, name)
+    return state
+
+
+def object_size(obj):
+    """ Bytes Held By An Object: Itself, Its Instance Dict And The Dicts
+    It Stores Directly (Option Storage, Option Groups), Not Its Data """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size + sum(sys.getsizeof(value) for value in
+                      instance_state(obj).values() if isinstance(value, dict))
+
+
+def options_of(obj):
+    """ Option Dict Of An Option Object (Plain __dict__ In Older Trees) """
+    options = getattr(type(obj), '__options__', None)
+    return options(obj) if options is not None else vars(obj)
+
+
+def chart_objects(chart):
+    """ Every Option And Series Object Of A Chart """
+    objects = []
+    for option_class in chart.options.values():
+        if option_class is None:
+            continue
+        objects.append(option_class)
+        objects.extend(v for v in options_of(option_class).values()
+                       if hasattr(type(v), '__options__'))
+    objects.extend(chart.options['series'].data)
+    return objects
+
+
+def many_series_chart(series=2000):
+    """ A Chart With Many Short Series """
+    chart = Highchart()
+    for i in range(series):
+        chart.add_data_set([i, i + 1, i + 2], series_type="line",
+            name="Series %d" % i)
+    return chart
+
+
+def sample_series():
+    """ One Series, For The Attribute Timings """
+    return many_series_chart(1).options['series'].data[0]
+
+
+def memory_benchmark(series=2000):
+    """ Bytes Taken By The Option And Series Objects Of A Many Series Chart """
+    chart = many_series_chart(series)
+    data_sets = chart.options['series'].data
+    total = sum(object_size(obj) for obj in chart_objects(chart))
+    print "all objects: %d bytes" % total
+    print "per series: %.1f bytes" % (
+        float(sum(object_size(obj) for obj in data_sets)) / len(data_sets))
+
+
+def attribute_benchmark(number=1000000):
+    """ Time Reading Series Attributes """
+    setup = "from PyHighcharts.highcharts.benchmarks import sample_series; " \
+            "series = sample_series()"
+    for attribute in ("name", "data", "type"):
+        timer = timeit.Timer("series.%s" % attribute, setup)
+        seconds = min(timer.repeat(3, number))
+        print "series.%s: %.1f ns" % (attribute, seconds / number * 1e9)
+
+
+if __name__ == '__main__':
+    memory_benchmark()
+    attribute_benchmark()
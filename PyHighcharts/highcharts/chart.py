@@ -13,14 +13,24 @@ from PyHighcharts.highcharts.options import ChartOptions, \
     PlotOptions, SeriesData, SubtitleOptions, TitleOptions, \
     TooltipOptions, xAxisOptions, yAxisOptions 
 
-from PyHighcharts.highcharts.highchart_types import Series, SeriesOptions, HighchartsError, MultiAxis
+from PyHighcharts.highcharts.highchart_types import Series, SeriesOptions, HighchartsError, MultiAxis, \
+    checked_options, DATA_SERIES_CHECKS, DATA_SERIES_ALLOWED_OPTIONS, XY_SERIES_TYPES
 from PyHighcharts.highcharts.common import Formatter
+from PyHighcharts.highcharts.serializer import Serializer, SharedColumns, \
+    serialize, FORMAT_SPECIAL_CASES
+from PyHighcharts.highcharts.templates import TEMPLATES
+from PyHighcharts.highcharts.downsample import downsample as reduce_points
+from PyHighcharts.highcharts import pyramid
+from PyHighcharts.highcharts.sidecar import SidecarFiles
+from PyHighcharts.highcharts.compress import Outputs
+from PyHighcharts.highcharts.assets import ASSETS
+from PyHighcharts.highcharts.encoders import epoch_ms, TIMESTAMP_MODES, \
+    BINARY_DECODER, as_array, is_array, regular_step, to_datetime64, np as numpy
 
 
 
 # Stdlib Imports
-import datetime, random, webbrowser, os, inspect, urllib
-from _abcoll import Iterable
+import datetime, random, webbrowser, os, inspect, urllib, itertools
 
 DEFAULT_HEADERS = """<script type='text/javascript' src=\
 'https://ajax.googleapis.com/ajax/libs/jquery/1.7.2/jquery.min.js'></script>
@@ -32,6 +42,20 @@ HIGHSTOCK_DEFAULT_HEADERS = """<script type='text/javascript' src=\
 'https://ajax.googleapis.com/ajax/libs/jquery/1.7.2/jquery.min.js'></script>
 <script src="http://code.highcharts.com/stock/highstock.js"></script>"""
 
+# The scripts of DEFAULT_HEADERS / HIGHSTOCK_DEFAULT_HEADERS, bundled from
+# an asset directory holding files of the same names for offline pages
+DEFAULT_SCRIPTS = [
+    'https://ajax.googleapis.com/ajax/libs/jquery/1.7.2/jquery.min.js',
+    'http://code.highcharts.com/highcharts.js',
+    'http://code.highcharts.com/highcharts-more.js',
+    'http://code.highcharts.com/modules/exporting.js',
+]
+
+HIGHSTOCK_DEFAULT_SCRIPTS = [
+    'https://ajax.googleapis.com/ajax/libs/jquery/1.7.2/jquery.min.js',
+    'http://code.highcharts.com/stock/highstock.js',
+]
+
 ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))))
 # Static Vars
 BASE_TEMPLATE = os.path.join(ROOT_PATH,"templates", "base.tmp")
@@ -42,21 +66,17 @@ HIGHSTOCK_SHOW_TEMPLATE = os.path.join(ROOT_PATH,"templates", "highstock_show_te
 
 DEFAULT_POINT_INTERVAL = 86400000
 
-FORMAT_SPECIAL_CASES = {
-    "formatter": "formatter",
-    "labelFormatter": "formatter",
-    "pointStart": "skip_quotes",
-    "events": "skip_quotes",
-    "load": "skip_quotes",
-    "multiaxis": "multiaxis"
-}
-
 class HighchartError(Exception):
     """ Highcharts Error Class """
     def __init__(self, *args):
         Exception.__init__(self, *args)
         self.args = args
 
+def localize_urls(html):
+    """ Point CDN Script URLs At A Local /js Directory """
+    html = html.replace('https://ajax.googleapis.com/ajax/libs/jquery/1.7.2','/js')
+    return html.replace('http://code.highcharts.com','/js')
+
 def color_formatter(data):
     """ Nothing to see here """
     return str(data['colors'])
@@ -64,143 +84,20 @@ def color_formatter(data):
 
 def update_template(tmp, key, val, tab_depth=1):
     """ Generate Json Dicts """
-    if key not in FORMAT_SPECIAL_CASES:
-        # Value Checking
-        if isinstance(val, dict):
-            tmp += "\t%s: {\n" % key
-            for subkey, subval in val.items():
-                tmp = update_template(tmp, subkey, subval, tab_depth=3)
-            tmp += "\t\t" + "},\n"
-            return tmp
-        elif isinstance(val, Iterable) and not isinstance(val, str):
-            new_vals = []
-            for item in val:
-                if isinstance(item, dict):
-                    ntmp = "{"
-                    for k,v in item.items():
-                        ntmp = update_template(ntmp, k, v, tab_depth=0)
-                    ntmp += "}"
-                    new_vals.append(ntmp)
-                elif isinstance(item, Iterable) and not isinstance(item, str):
-                    new_items = []
-                    for subitem in item:
-                        if isinstance(subitem, datetime.datetime):
-                            utc = subitem.utctimetuple()
-                            new_items.append("Date.UTC({year},{month},{day},{hours},{minutes},{seconds},{millisec})"
-                                        .format(year=utc[0], month=utc[1]-1, day=utc[2], hours=utc[3], 
-                                                minutes=utc[4], seconds=utc[5], millisec=subitem.microsecond/1000))
-                        elif isinstance(subitem, bool):
-                            # Convert Bool to js equiv.
-                            bool_mapping = {
-                                False: 'false',
-                                True: 'true',
-                            }
-                            new_items.append(bool_mapping[subitem])
-                        elif isinstance(subitem, str):
-                            # Need to keep string quotes
-                            new_items.append("\'" + subitem + "\'")
-                        else:
-                            new_items.append(str(subitem))
-                    new_vals.append("[{}]".format(",".join(new_items)))
-                elif isinstance(item, datetime.datetime):
-                    utc = item.utctimetuple()
-                    new_vals.append("Date.UTC({year},{month},{day},{hours},{minutes},{seconds},{millisec})"
-                           .format(year=utc[0], month=utc[1], day=utc[2], hours=utc[3],
-                                   minutes=utc[4], seconds=utc[5], millisec=item.microsecond/1000))
-                elif isinstance(item, bool):
-                    # Convert Bool to js equiv.
-                    bool_mapping = {
-                        False: 'false',
-                        True: 'true',
-                    }
-                    new_vals.append(bool_mapping[item])
-                elif item == None:
-                    new_vals.append('null')
-                elif isinstance(item, str):
-                    # Need to keep string quotes
-                    new_vals.append("\'" + item + "\'")
-                else:
-                    new_vals.append(str(item))
-            return tmp + "{tabs}{key}:[{vals}],\n".format(tabs="\t"*tab_depth, key=key, vals=",".join(new_vals))
-        elif isinstance(val, datetime.datetime):
-            utc = val.utctimetuple()
-            val = ("Date.UTC({year},{month},{day},{hours},{minutes},{seconds},{millisec})"
-                    .format(year=utc[0], month=utc[1], day=utc[2], hours=utc[3],
-                            minutes=utc[4], seconds=utc[5], millisec=val.microsecond/1000))
-        elif isinstance(val, bool):
-            # Convert Bool to js equiv.
-            bool_mapping = {
-                False: 'false',
-                True: 'true',
-            }
-            val = bool_mapping[val]
-        elif val == None:
-            val = 'null'
-        elif isinstance(val, str):
-            # Need to keep string quotes
-            val = "\'" + val + "\'"
-        tmp += "\t"*tab_depth + "%s: %s,\n" % (key, val)
-    else:
-        if FORMAT_SPECIAL_CASES[key] == "skip_quotes":
-            tmp += "\t"*tab_depth + "%s: %s,\n" % (key, val)
-        elif FORMAT_SPECIAL_CASES[key] == "formatter":
-            tmp += "\t"*tab_depth + "%s: %s,\n" % (key, val.formatter)
-        elif FORMAT_SPECIAL_CASES[key] == "multiaxis":
-            st = ""
-            for k, v in val.__dict__.iteritems():
-                st = update_template(st, k, v, tab_depth=tab_depth+1)
-            return st
-        else:
-            raise NotImplementedError
-    return tmp
+    buf = [tmp]
+    Serializer(buf.append).option(key, val, tab_depth=tab_depth)
+    return "".join(buf)
 
 def series_formatter(data):
     """ Special Formatting For Series """
-    temp = ""
-    for data_set in data['data']:
-        temp += "{\n"
-        for key, val in  data_set.__dict__.items():
-            temp = update_template(temp, key, val, tab_depth=1)    
-        temp += "\t},"
-    return temp
+    buf = []
+    Serializer(buf.append).series(data)
+    return "".join(buf)
 
 
-def chart_formatter(option_type, data):
+def chart_formatter(option_type, data, **settings):
     """ Formatter Function """
-    # Special Cases
-    special_cases = {
-        "colors": color_formatter,
-        "series": series_formatter,
-    }
-    tmp = ""
-    #print option_type, data
-    if option_type in special_cases:
-        tmp += special_cases[option_type](data)
-    elif option_type == "yAxis" and data.get('axis'):
-        tmp += "[{\n"
-        for i, ax in enumerate(data['axis'], 1):
-            tmp += update_template("", 'multiaxis', ax, tab_depth=1)
-            if not i == len(data['axis']):
-                tmp += "\t},{\n"
-        tmp += "\t}]"
-        print tmp
-    else:
-        tmp += "{\n" 
-        for key, val in data.items():
-            if isinstance(val, dict):
-                tmp += "\t%s: {\n" % key
-                for subkey, subval in val.items():
-                    tmp = update_template(tmp, subkey, subval, tab_depth=3)
-                tmp += "\t\t" + "},\n"
-            elif isinstance(val, SeriesOptions):
-                tmp += "\t%s: {\n" % key
-                for subkey, subval in val.__dict__.items():
-                    tmp = update_template(tmp, subkey, subval, tab_depth=3)
-                tmp += "\t\t" + "},\n"
-            else:
-                tmp = update_template(tmp, key, val, tab_depth=2)
-        tmp += "\t}"
-    return tmp
+    return serialize(option_type, data, **settings)
 
 
 class Highchart(object):
@@ -258,27 +155,127 @@ class Highchart(object):
         # Some Extra Vals to store: 
         self.data_set_count = 0
 
+        # Mutations recorded since checkpoint(), None when not recording
+        self.changes = None
+
+        # Date.UTC(...) calls ('utc') or integer epoch milliseconds ('epoch')
+        self.timestamps = kwargs.get('timestamps', 'utc')
+        if self.timestamps not in TIMESTAMP_MODES:
+            raise HighchartError("Timestamp Mode Must Be One Of: %s" % (TIMESTAMP_MODES,))
+
+        # Float series values are written with at most precision significant
+        # digits or decimals decimal places (see add_data_set)
+        self.precision = kwargs.get('precision')
+        self.decimals = kwargs.get('decimals')
+        self.__check_digits__(self.precision, self.decimals)
+
+        # Skip option type checks (option names are still checked)
+        self.trusted = kwargs.get('trusted', False)
+
         self.base_template = BASE_TEMPLATE
         self.gecko_template = GECKO_TEMPLATE
         self.show_template = SHOW_TEMPLATE
 
 
-    def __render__(self, ret=False, template="base"):
+    def __render__(self, ret=False, template="base", binary_threshold=None,
+                   delta_x=False):
+        rendered = "".join(self.iter_render(template=template,
+            binary_threshold=binary_threshold, delta_x=delta_x))
+        if ret: 
+            return rendered
+
+
+    def iter_render(self, template="base", binary_threshold=None,
+                    delta_x=False, shared=None, sidecar=None):
+        """ Yield The Chart Script In Chunks, One Chunk Per Series
+
+        x vectors shared by several series are declared once up front and
+        referenced by name. A page holding several charts can pass its own
+        SharedColumns (see share_x) and declare them itself instead.
+
+        With a SidecarFiles, numeric series data is written to files and
+        the script runs once the page has loaded them.
+        """
+        chunks = self.__iter_script__(template, binary_threshold, delta_x,
+            shared, sidecar)
+        if sidecar is None:
+            return chunks
+        # The files to load are only known once every series is serialized
+        chunks = list(chunks)
+        return itertools.chain([sidecar.head()], chunks, [sidecar.tail()])
+
+
+    def __iter_script__(self, template, binary_threshold, delta_x, shared,
+                        sidecar):
+        data_sets = self.options['series'].data
+        declare_shared = shared is None
         if template == "base":
             TEMPLATE = self.base_template
+            if shared is None and sidecar is None:
+                shared = SharedColumns()
+                self.share_x(shared)
         elif template == "gecko":
+            # Plain object literal: no room for the decoder or variables
             TEMPLATE = self.gecko_template
-        with open(TEMPLATE,"rb") as template_file:
-            tmp = template_file.read()
-        rendered = tmp.format(**self.__export_options__())
-        if ret: 
-            return rendered
+            binary_threshold = None
+            shared = None
+            sidecar = None
+        serializer = Serializer(None, timestamps=self.timestamps,
+            binary_threshold=binary_threshold, delta_x=delta_x,
+            shared_x=shared, sidecar=sidecar, precision=self.precision,
+            decimals=self.decimals)
+        if any(serializer.binary_candidate(data_set.data) or
+               serializer.binary_candidate(data_set.x)
+               for data_set in data_sets):
+            yield BINARY_DECODER
+        if declare_shared and shared is not None:
+            yield shared.script(serializer)
+        for literal, field in TEMPLATES.get(TEMPLATE).parts:
+            if literal:
+                yield literal
+            if field is None:
+                continue
+            if field == 'series':
+                for data_set in data_sets:
+                    yield self.__serialize_block__(serializer, field,
+                        data_set, {'data': [data_set]})
+            else:
+                option_class = self.options[field]
+                yield self.__serialize_block__(serializer, field,
+                    option_class, option_class.__options__())
+
+
+    def share_x(self, shared):
+        """ Register the x vectors of every series with a SharedColumns """
+        for data_set in self.options['series'].data:
+            shared.add(data_set.x)
+
+
+    @staticmethod
+    def __serialize_block__(serializer, option_type, holder, data):
+        """ Serialize data, reusing the fragment cached on holder (an option
+        class) while neither it nor the settings changed. Series blocks hold
+        the data: they are rendered afresh and never kept, so a written
+        chart holds no copy of its data as text """
+        cache = option_type != 'series'
+        if cache:
+            key = (serializer.settings(), holder.__state__())
+            fragment = holder.__cached__(key)
+            if fragment is not None:
+                return fragment
+        buf = []
+        serializer.write = buf.append
+        serializer.block(option_type, data)
+        fragment = "".join(buf)
+        if cache:
+            holder.__cache__(key, fragment)
+        return fragment
 
 
     def __export_options__(self):
-        bind = self.options.items()
-        data = {k:chart_formatter(k, opClass.__dict__) \
-            for k, opClass in bind}
+        serializer = Serializer(None, timestamps=self.timestamps)
+        data = {k:self.__serialize_block__(serializer, k, opClass, \
+            opClass.__options__()) for k, opClass in self.options.items()}
         return data
 
 
@@ -298,7 +295,7 @@ class Highchart(object):
     def colors(self, colors=None):
         """ Bind Color Array """
         if not colors:
-            return self.options["colors"].__dict__.values() if self.options['colors'] is not None else []
+            return self.options["colors"].__options__().values() if self.options['colors'] is not None else []
         else:
             self.options["colors"].set_colors(colors)
 
@@ -328,14 +325,16 @@ class Highchart(object):
         }
         formatted_date = "Date.UTC({year}, {month}, {day}, {hour}, {minute}, {second})"
         formatted_date = formatted_date.format(**date_dict)
-        if not self.options['plotOptions'].__dict__: 
+        if self.timestamps == 'epoch':
+            formatted_date = epoch_ms(date)
+        if not self.options['plotOptions'].__options__(): 
             self.hold_point_start = formatted_date
             self.hold_point_interval = DEFAULT_POINT_INTERVAL
-        hold_iterable = self.options['plotOptions'].__dict__.items()
+        hold_iterable = self.options['plotOptions'].__options__().items()
         for series_type, series_options in hold_iterable:
             series_options.process_kwargs({'pointStart':formatted_date},
                 series_type=series_type)
-            if not 'pointInterval' in series_options.__dict__: 
+            if not 'pointInterval' in series_options.__options__(): 
                 series_options.process_kwargs({
                     'pointInterval':DEFAULT_POINT_INTERVAL},
                     series_type=series_type,
@@ -352,9 +351,9 @@ class Highchart(object):
         # Unset Any Held Values To Avoid Them Overwriting This Value
         if self.hold_point_interval: 
             self.hold_point_interval = None
-        if not self.options['plotOptions'].__dict__: 
+        if not self.options['plotOptions'].__options__(): 
             self.hold_point_interval = interval
-        for hold_item in self.options['plotOptions'].__dict__.items():
+        for hold_item in self.options['plotOptions'].__options__().items():
             series_type, series_options = hold_item
             series_options.process_kwargs({'pointInterval':interval},
                 series_type=series_type)
@@ -362,8 +361,31 @@ class Highchart(object):
             print "Set The Start Date With .set_start_date(date)"
 
 
-    def add_data_set(self, data, series_type="line", name=None, **kwargs):
-        """ Update Plot Options With Defaults If None Exist """
+    def add_data_set(self, data, series_type="line", name=None, x=None,
+                     max_points=None, downsample='lttb', detect_interval=True,
+                     precision=None, decimals=None, **kwargs):
+        """ Update Plot Options With Defaults If None Exist
+
+        With x given, data holds the y values alone; series passed the same
+        x vector write it only once.
+
+        Series longer than max_points are reduced with the 'lttb' (Largest
+        Triangle Three Buckets) or 'minmax' (extremes per bucket) method;
+        the returned Series records points_dropped. y-only data keeps the
+        position of each point as its x. Only y-only or [x, y] data of the
+        XY_SERIES_TYPES can be reduced, with numeric y and numeric or date
+        x; anything else raises HighchartError.
+
+        With detect_interval, an x array (or the x column of [x, y] array
+        data) growing by a constant step is replaced by the series'
+        pointStart / pointInterval, and only y values are written.
+
+        precision (significant digits) or decimals (decimal places) round
+        the series' float y values as they are written, overriding the
+        chart's setting; columns left holding whole numbers are written as
+        integers. x values are never rounded.
+        """
+        self.__check_digits__(precision, decimals)
         self.data_set_count += 1      
         if not name: 
             name = "Series %d" % self.data_set_count
@@ -374,50 +396,313 @@ class Highchart(object):
         if self.hold_point_interval: 
             kwargs.update({"pointInterval":self.hold_point_interval})
             self.hold_point_interval = None
-        if series_type not in self.options["plotOptions"].__dict__:
+        if series_type not in self.options["plotOptions"].__options__():
             to_update = {series_type:SeriesOptions(series_type=series_type,
-                supress_errors=True, **kwargs)}
+                supress_errors=True, trusted=self.trusted, **kwargs)}
             self.options["plotOptions"].update_dict(**to_update)
+        dropped = 0
+        if max_points is not None and len(data) > max_points:
+            x, data, dropped = self.__downsample__(data, x, max_points,
+                downsample, kwargs.get('type', series_type))
+        if detect_interval and 'pointStart' not in kwargs:
+            x, data = self.__detect_interval__(data, x, kwargs,
+                kwargs.get('type', series_type))
         series_data = Series(data, series_type=series_type, \
-            supress_errors=True, **kwargs)
+            supress_errors=True, x=x, trusted=self.trusted, **kwargs)
+        series_data.points_dropped = dropped
+        series_data.precision, series_data.decimals = precision, decimals
         self.options["series"].data.append(series_data)
+        self.__record__('series', series_data)
+        return series_data
+
+
+    def add_data_sets(self, matrix, names=None, x=None, series_type="line",
+                      max_points=None, downsample='lttb', detect_interval=True,
+                      precision=None, decimals=None, **kwargs):
+        """ Add One Series Per Column Of A 2-D Block Of y Values
+
+        matrix is a 2-D array (one series per column) or a sequence of 1-D
+        columns, all sharing x; columns are kept as views, not copied.
+        names gives one name per column ("Series <n>" where missing).
+
+        kwargs are validated once and apply to every series, and a shared
+        x is checked once for a regular interval. The other arguments are
+        those of add_data_set. Returns the list of new Series.
+        """
+        self.__check_digits__(precision, decimals)
+        columns = as_array(matrix)
+        if is_array(columns):
+            if columns.ndim != 2:
+                raise HighchartError("matrix Must Be 2-D: One Column Per Series")
+            columns = [columns[:, i] for i in range(columns.shape[1])]
+        else:
+            columns = [as_array(column) for column in columns]
+        if names is None:
+            names = [None] * len(columns)
+        elif len(names) != len(columns):
+            raise HighchartError("Expected %d Names, Got %d" % (len(columns), len(names)))
+        if not columns:
+            return []
+        if series_type not in self.options["plotOptions"].__options__():
+            to_update = {series_type:SeriesOptions(series_type=series_type,
+                supress_errors=True, trusted=self.trusted, **kwargs)}
+            self.options["plotOptions"].update_dict(**to_update)
+        shared = checked_options(kwargs, DATA_SERIES_CHECKS,
+            DATA_SERIES_ALLOWED_OPTIONS, supress_errors=True, trusted=self.trusted)
+        x = as_array(x)
+        reduce = max_points is not None and len(columns[0]) > max_points
+        if detect_interval and not reduce and 'pointStart' not in shared:
+            x, _ = self.__detect_interval__(columns[0], x, shared)
+        check_name = DATA_SERIES_CHECKS['name']
+        added = []
+        for column, name in itertools.izip(columns, names):
+            self.data_set_count += 1
+            options = dict(shared)
+            if not name:
+                name = "Series %d" % self.data_set_count
+            if self.trusted or check_name(name):
+                options['name'] = name
+            if self.hold_point_start:
+                options["pointStart"] = self.hold_point_start
+                self.hold_point_start = None
+            if self.hold_point_interval:
+                options["pointInterval"] = self.hold_point_interval
+                self.hold_point_interval = None
+            series_x, dropped = x, 0
+            if reduce:
+                series_x, column, dropped = self.__downsample__(column, x,
+                    max_points, downsample, series_type)
+            series_data = Series(column, series_type=series_type,
+                supress_errors=True, x=series_x, trusted=True, **options)
+            series_data.points_dropped = dropped
+            series_data.precision, series_data.decimals = precision, decimals
+            self.options["series"].data.append(series_data)
+            self.__record__('series', series_data)
+            added.append(series_data)
+        return added
 
 
-    def set_options(self, options, force_options=False):
-        """ Set Plot Options """
+    @staticmethod
+    def __downsample__(data, x, max_points, method, series_type="line"):
+        """ Split data into x / y columns and reduce them """
+        data = as_array(data)
+        if not is_array(data):
+            data = numpy.asarray(data)
+        if x is None and data.ndim == 2 and data.shape[1] == 2 and \
+                series_type in XY_SERIES_TYPES:
+            x, data = data[:, 0], data[:, 1]
+        elif x is None and data.ndim == 1:
+            x = numpy.arange(len(data))
+        if x is None or data.ndim != 1:
+            raise HighchartError("Only [x, y] Series Can Be Downsampled")
+        x = Highchart.__sample_column__(as_array(x), dates=True)
+        data = Highchart.__sample_column__(data)
+        try:
+            return reduce_points(x, data, max_points, method)
+        except ValueError as err:
+            raise HighchartError(*err.args)
+
+
+    @staticmethod
+    def __sample_column__(values, dates=False):
+        """ A column as numbers to downsample: None becomes NaN and, with
+        dates, python dates become datetime64 """
+        values = numpy.asarray(values)
+        if values.dtype.kind in 'biufM':
+            return values
+        try:
+            if dates and any(isinstance(v, datetime.date) for v in values):
+                return to_datetime64(values)
+            return numpy.array([numpy.nan if v is None else v for v in values],
+                dtype=numpy.float64)
+        except (TypeError, ValueError, AttributeError):
+            raise HighchartError("Only Numeric%s Values Can Be Downsampled" %
+                (" Or Date" if dates else ""))
+
+
+    @staticmethod
+    def __check_digits__(precision, decimals):
+        """ Validate a precision / decimals pair """
+        if precision is not None and decimals is not None:
+            raise HighchartError("Set Either precision Or decimals, Not Both")
+        if precision is not None and (not isinstance(precision, int) or precision < 1):
+            raise HighchartError("precision Must Be A Positive Integer")
+        if decimals is not None and (not isinstance(decimals, int) or decimals < 0):
+            raise HighchartError("decimals Must Be A Non Negative Integer")
+
+
+    @staticmethod
+    def __detect_interval__(data, x, kwargs, series_type="line"):
+        """ Drop a regularly spaced x in favour of pointStart / pointInterval
+        entries in kwargs; two column data is only taken as [x, y] for
+        series types whose points are [x, y] """
+        data = as_array(data)
+        column = as_array(x)
+        if column is None and is_array(data) and data.ndim == 2 and \
+                data.shape[1] == 2 and series_type in XY_SERIES_TYPES:
+            column = data[:, 0]
+        step = regular_step(column)
+        if step is None:
+            return x, data
+        if x is None:
+            data = data[:, 1]
+        kwargs.update({'pointStart': step[0], 'pointInterval': step[1]})
+        return None, data
+
+
+    def add_point(self, series, point):
+        """ Append A Point To A Series Given By Index Or Name """
+        data_sets = self.options["series"].data
+        if isinstance(series, int):
+            index = series
+        else:
+            names = [data_set.__options__().get('name') for data_set in data_sets]
+            if series not in names:
+                raise HighchartError("No Such Series: %s" % series)
+            index = names.index(series)
+        try:
+            data_sets[index].add_point(point)
+        except HighchartsError as err:
+            raise HighchartError(*err.args)
+        self.__record__('point', (index, data_sets[index], point))
+
+
+    def set_options(self, options, force_options=False, trusted=False):
+        """ Set Plot Options
+
+        options maps option blocks ('chart', 'xAxis', ...) to dicts of their
+        options, option groups given as nested dicts; every block is
+        validated before any is stored, so an invalid option leaves the
+        chart unchanged. trusted (or a chart created with trusted=True)
+        skips the type checks for machine generated configs.
+        """
         if force_options:
             for k, v in options.items():
                 self.options.update({k:v})
-        else:
-            new_options = {}
-            for key, option_data in options.items():
-                data = {}
-                for key2, val in option_data.items():
-                    if isinstance(val, dict):
-                        for key3, val2 in val.items():    
-                            data.update({key2+"_"+key3:val2})
-                    else:   
-                        data.update({key2:val})
-                new_options.update({key:data})
-            for key, val in new_options.items():
-                self.options[key].update_dict(**val)
-
-    def write(self, temp_dir='.', fname=None, localurl=False):
-        """ Write to file, returns filename """
+            self.__record__('options', options)
+            return
+        staged = [(self.options[key], key, self.options[key].__stage_options__(
+            option_data, trusted=trusted or self.trusted))
+            for key, option_data in options.items()]
+        applied = {}
+        for block, key, block_staged in staged:
+            block.__store_options__(block_staged)
+            # "group_name" keys replayed as the groups they resolve to
+            applied[key] = block.__nested_options__(block_staged)
+        self.__record__('options', applied)
+
+    def checkpoint(self):
+        """ Start recording the mutations export_delta() will replay """
+        self.changes = []
+
+
+    def __record__(self, kind, change):
+        if self.changes is not None:
+            self.changes.append((kind, change))
+
+
+    def export_delta(self, chart_var='chart', redraw=True):
+        """ JS patch (addSeries / addPoint / update calls on chart_var)
+        replaying everything recorded since the last checkpoint; starts a
+        new checkpoint """
+        if self.changes is None:
+            raise HighchartError("Call checkpoint() Before export_delta()")
+        buf = []
+        serializer = Serializer(buf.append, timestamps=self.timestamps,
+            precision=self.precision, decimals=self.decimals)
+        added = [change for kind, change in self.changes if kind == 'series']
+        for kind, change in self.changes:
+            if kind == 'series':
+                buf.append("%s.addSeries(" % chart_var)
+                serializer.series_object(change)
+                buf.append(", false);\n")
+            elif kind == 'point':
+                index, data_set, point = change
+                if any(data_set is series_data for series_data in added):
+                    # Already part of the data sent with addSeries
+                    continue
+                buf.append("%s.series[%d].addPoint(%s, false);\n" % (
+                    chart_var, index, serializer.array([point])))
+            elif kind == 'options':
+                buf.append("%s.update(" % chart_var)
+                serializer.object(change)
+                buf.append(", false);\n")
+        if redraw and self.changes:
+            buf.append("%s.redraw();\n" % chart_var)
+        self.checkpoint()
+        return "".join(buf)
+
+
+    def write(self, temp_dir='.', fname=None, localurl=False,
+              binary_threshold=None, delta_x=False, sidecar=False,
+              compress=(), plain=True, bundle=None, asset_dir=None):
+        """ Write to file, returns filename
+
+        Series data arrays with at least binary_threshold points are
+        embedded as base64 typed array buffers; delta_x additionally
+        stores monotonic integer x values as differences.
+
+        With sidecar, the data of numeric (numpy / pandas) series goes to
+        content hashed JSON files in a <fname>_data directory, loaded by
+        the page; files of unchanged series are reused rather than
+        rewritten. The page must be served over http to load them.
+
+        compress ('gzip', 'br' or both) also writes <fname>.gz / .br
+        siblings, compressed while the page is streamed; with plain False
+        only those are written and the first of them is returned.
+
+        bundle loads jQuery / Highcharts from asset_dir (default
+        $PYHIGHCHARTS_ASSETS) instead of the CDN: 'inline' embeds them,
+        'reference' links content hashed copies in <temp_dir>/assets.
+        """
         if fname is None:
             new_filename = "%x.html" % (random.randint(pow(16, 5), pow(16, 6)-1))
         else:
             new_filename = fname
         new_fn = os.path.join(temp_dir, new_filename)
-        with open(self.show_template, 'rb') as file_open:
-            tmp = file_open.read()
-        html = tmp.format(chart_data=self.__render__(ret=True))
-        if localurl:
-            html = html.replace('https://ajax.googleapis.com/ajax/libs/jquery/1.7.2','/js')
-            html = html.replace('http://code.highcharts.com','/js')
-        with open(new_fn, 'wb') as file_open:
-            file_open.write(html)
-        return new_fn
+        files = None
+        if sidecar:
+            data_dir = os.path.splitext(new_filename)[0] + "_data"
+            files = SidecarFiles(os.path.join(temp_dir, data_dir), data_dir + "/")
+        try:
+            # CDN headers (bundle None) are left to write_stream to localize
+            headers = self.headers(bundle, temp_dir, asset_dir) if bundle else None
+            outputs = Outputs(new_fn, compress=compress, plain=plain)
+        except ValueError as err:
+            raise HighchartError(*err.args)
+        with outputs:
+            self.write_stream(outputs, localurl=localurl,
+                binary_threshold=binary_threshold, delta_x=delta_x,
+                sidecar=files, headers=headers)
+        return outputs.paths[0]
+
+    def write_stream(self, fileobj, localurl=False, binary_threshold=None,
+                     delta_x=False, sidecar=None, headers=None):
+        """ Write the page to an open file (or socket.makefile()) chunk by
+        chunk, never holding more than one series' text in memory; headers
+        given (e.g. bundled scripts from headers()) are written as they are,
+        localurl only rewrites the CDN ones """
+        for literal, field in TEMPLATES.get(self.show_template).parts:
+            fileobj.write(localize_urls(literal) if localurl else literal)
+            if field == 'headers':
+                if headers is None:
+                    headers = self.need()
+                    if localurl:
+                        headers = localize_urls(headers)
+                fileobj.write(headers)
+            elif field == 'chart_data':
+                for chunk in self.iter_render(
+                        binary_threshold=binary_threshold, delta_x=delta_x,
+                        sidecar=sidecar):
+                    fileobj.write(chunk)
+
+    def headers(self, bundle=None, temp_dir='.', asset_dir=None):
+        """ Script Tags Of A Page Written To temp_dir: The CDN Ones, Or With
+        bundle ('inline' / 'reference') Those Of The Asset Directory """
+        if bundle is None:
+            return self.need()
+        return ASSETS.headers(self.scripts(), bundle, temp_dir=temp_dir,
+            directory=asset_dir)
 
     def show(self, temp_dir='.', fname=None):
         """ Show Function """
@@ -425,9 +710,10 @@ class Highchart(object):
         new_fn = self.write(temp_dir, fname)
         handle.open("file:"+urllib.pathname2url(new_fn))
 
-    def generate(self):
+    def generate(self, binary_threshold=None, delta_x=False):
         """ __render__ Wrapper """
-        return self.__render__(ret=True)
+        return self.__render__(ret=True, binary_threshold=binary_threshold,
+            delta_x=delta_x)
 
 
     def set_yAxis(self, *axis):
@@ -442,6 +728,11 @@ class Highchart(object):
         """ Returns Header """
         return DEFAULT_HEADERS
 
+    @staticmethod
+    def scripts():
+        """ Returns Header Script URLs """
+        return DEFAULT_SCRIPTS
+
 class Highstock(Highchart):
     """ Highstock Wrapper """
 
@@ -451,8 +742,73 @@ class Highstock(Highchart):
         self.gecko_template = GECKO_TEMPLATE
         self.show_template = HIGHSTOCK_SHOW_TEMPLATE
     
+    def write_pyramid(self, temp_dir='.', fname=None, localurl=False,
+                      base_points=1000, factor=4, chunk_points=20000,
+                      how='mean', **write_kwargs):
+        """ Write to file with zoom dependent detail, returns filename
+
+        Series with sorted numeric or datetime x and more than
+        base_points * factor points are embedded at about base_points
+        buckets. Finer levels, each factor times as detailed ('mean',
+        'minmax' or 'ohlc' per bucket, raw points last), are written as
+        JSON files of chunk_points points to a <fname>_data directory and
+        fetched for the visible range when the chart is zoomed; the page
+        must be served over http for that.
+        """
+        if how not in pyramid.PYRAMID_METHODS:
+            raise HighchartError("Pyramid Method Must Be One Of: %s" % (pyramid.PYRAMID_METHODS,))
+        if fname is None:
+            fname = "%x.html" % (random.randint(pow(16, 5), pow(16, 6)-1))
+        data_dir = os.path.splitext(fname)[0] + "_data"
+        manifests, swapped = [], []
+        for index, data_set in enumerate(self.options['series'].data):
+            columns = pyramid.series_columns(data_set)
+            if columns is None or len(columns[0]) <= base_points * factor:
+                continue
+            levels = pyramid.build_levels(columns[0], columns[1],
+                base_points=base_points, factor=factor, how=how)
+            if len(levels) < 2:
+                continue
+            if not os.path.isdir(os.path.join(temp_dir, data_dir)):
+                os.makedirs(os.path.join(temp_dir, data_dir))
+            manifest = {'series': index, 'points': base_points, 'levels': []}
+            for depth, (width, level) in enumerate(levels[1:], 1):
+                chunks = pyramid.write_chunks(level, os.path.join(temp_dir,
+                    data_dir), "s%d_l%d" % (index, depth), chunk_points)
+                manifest['levels'].append({'width': width, 'chunks': chunks})
+            manifests.append(manifest)
+            swapped.append((data_set, data_set.x, data_set.data))
+            coarse = levels[0][1]
+            if len(coarse) == 2:
+                data_set.x, data_set.data = coarse
+            else:
+                data_set.x, data_set.data = None, numpy.column_stack(coarse)
+        events = self.options['chart'].events
+        try:
+            if manifests:
+                previous = (events or {}).get('load')
+                new_events = dict(events or {})
+                new_events['load'] = pyramid.loader(data_dir + "/", manifests,
+                    previous=previous)
+                self.options['chart'].update_dict(events=new_events)
+            return self.write(temp_dir, fname, localurl=localurl, **write_kwargs)
+        finally:
+            for data_set, x, data in swapped:
+                data_set.x, data_set.data = x, data
+            if manifests:
+                self.options['chart']._options.pop('events', None)
+                if events is not None:
+                    self.options['chart'].update_dict(events=events)
+                else:
+                    self.options['chart'].__changed__()
+
     @staticmethod
     def need():
         """ Returns Header """
         return HIGHSTOCK_DEFAULT_HEADERS
 
+    @staticmethod
+    def scripts():
+        """ Returns Header Script URLs """
+        return HIGHSTOCK_DEFAULT_SCRIPTS
+
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+""" PyHighcharts compress.py
+Stream a page to its plain file and precompressed siblings at once.
+
+Each chunk written goes to every output as it comes, so the page is never
+held in memory and compressing costs no extra pass over it. brotli is
+optional and only needed for 'br' output.
+"""
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from PyHighcharts.highcharts.encoders import open_temp, replace_file, remove_quietly
+
+# Stdlib Imports
+import gzip
+
+# Compression -> file name suffix of its sibling
+COMPRESSIONS = {
+    'gzip': '.gz',
+    'br': '.br',
+}
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class BrotliFile(object):
+    """ Write-Only File Object Brotli Compressing Into fileobj """
+
+    def __init__(self, fileobj, quality=BROTLI_QUALITY):
+        self.fileobj = fileobj
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def write(self, data):
+        compressed = self.compressor.process(data)
+        if compressed:
+            self.fileobj.write(compressed)
+
+    def close(self):
+        self.fileobj.write(self.compressor.finish())
+        self.fileobj.close()
+
+
+class GzipFile(object):
+    """ Write-Only File Object Gzip Compressing Into fileobj (Reproducible:
+    No Timestamp In The Header) """
+
+    def __init__(self, fileobj, level=GZIP_LEVEL):
+        self.fileobj = fileobj
+        self.gzip = gzip.GzipFile(filename="", mode='wb', compresslevel=level,
+                                  fileobj=fileobj, mtime=0)
+
+    def write(self, data):
+        self.gzip.write(data)
+
+    def close(self):
+        self.gzip.close()
+        self.fileobj.close()
+
+
+def compressions(compress):
+    """ Validated Tuple Of Compressions From A Name Or Sequence Of Names """
+    if not compress:
+        return ()
+    if isinstance(compress, str):
+        compress = (compress,)
+    for name in compress:
+        if name not in COMPRESSIONS:
+            raise ValueError("Compression Must Be One Of: %s" % (tuple(COMPRESSIONS),))
+        if name == 'br' and brotli is None:
+            raise ValueError("Brotli Output Requires The brotli Package")
+    return tuple(compress)
+
+
+class Outputs(object):
+    """ path Plus Its Compressed Siblings (path.gz, path.br), Written As One
+
+    With plain False only the compressed files are written. paths lists
+    every file written, the plain one first. The files are written aside
+    and moved into place on a clean close; leaving the with block on an
+    exception deletes them, so a failed render leaves no partial page.
+    """
+
+    def __init__(self, path, compress=(), plain=True):
+        compress = compressions(compress)
+        if not plain and not compress:
+            raise ValueError("Nothing To Write: plain Is False And No Compression Given")
+        self.paths = ([path] if plain else []) + [path + COMPRESSIONS[name]
+                                                  for name in compress]
+        self.files, self.temps = [], []
+        try:
+            for name in ((None,) if plain else ()) + compress:
+                raw, temp = open_temp(self.paths[len(self.temps)])
+                self.temps.append(temp)
+                if name is None:
+                    self.files.append(raw)
+                else:
+                    self.files.append(GzipFile(raw) if name == 'gzip' else BrotliFile(raw))
+        except BaseException:
+            self.close(discard=True)
+            raise
+
+    def write(self, data):
+        for output in self.files:
+            output.write(data)
+
+    def close(self, discard=False):
+        """ Finish Every File And Move It Into Place; discard Deletes Them """
+        files, temps, self.files, self.temps = self.files, self.temps, [], []
+        try:
+            for output in files:
+                output.close()
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            for temp, path in zip(temps, self.paths):
+                if discard:
+                    remove_quietly(temp)
+                else:
+                    replace_file(temp, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(discard=exc_type is not None)
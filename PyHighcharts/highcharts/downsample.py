@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+""" PyHighcharts downsample.py
+Server side reduction of long series to a number of points a browser can
+draw, keeping their visual shape (peaks included).
+
+Requires numpy.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def bucket_edges(count, buckets):
+    """ Boundaries Splitting range(count) Into Equally Sized Buckets """
+    return np.linspace(0, count, buckets + 1).astype(np.intp)
+
+
+def lttb_indices(x, y, max_points):
+    """ Indices Kept By Largest-Triangle-Three-Buckets
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    for the previous bucket and the mean of the next bucket. Bucket means
+    are computed for all buckets at once, the sequential part only runs
+    one argmax per bucket.
+    """
+    if max_points < 3:
+        raise ValueError("lttb Keeps At Least 3 Points: max_points Is %d" % max_points)
+    count = len(y)
+    if max_points >= count:
+        return np.arange(count)
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        x = x.astype('datetime64[ms]').astype(np.int64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(y)
+    edges = bucket_edges(count - 2, max_points - 2) + 1
+    starts, ends = edges[:-1], edges[1:]
+    # Mean of every bucket over its finite points (NaN if it has none)
+    counts = np.add.reduceat(finite.astype(np.intp), starts).astype(np.float64)
+    counts[counts == 0] = np.nan
+    mean_x = np.add.reduceat(np.where(finite, x, 0), starts) / counts
+    mean_y = np.add.reduceat(np.where(finite, y, 0), starts) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+    kept = np.empty(max_points, dtype=np.intp)
+    kept[0], kept[-1] = 0, count - 1
+    previous = 0
+    for i in range(max_points - 2):
+        bx, by = x[starts[i]:ends[i]], y[starts[i]:ends[i]]
+        areas = np.abs((x[previous] - mean_x[i]) * (by - y[previous]) -
+                       (x[previous] - bx) * (mean_y[i] - y[previous]))
+        areas[~np.isfinite(areas)] = -1
+        previous = kept[i + 1] = starts[i] + np.argmax(areas)
+    return kept
+
+
+def minmax_indices(x, y, max_points):
+    """ Indices Of The Minimum And Maximum Of (max_points - 2) / 2 Buckets
+
+    The first and last points are always kept; both extremes of every
+    bucket of the points in between are kept too, in their original
+    order. Missing values are never chosen over real ones.
+    """
+    if max_points < 4:
+        raise ValueError("minmax Keeps At Least 4 Points: max_points Is %d" % max_points)
+    count = len(y)
+    if max_points >= count:
+        return np.arange(count)
+    inner = np.asarray(y)[1:-1]
+    starts = bucket_edges(len(inner), (max_points - 2) // 2)[:-1]
+    return np.union1d([0, count - 1], bucket_extremes(inner, starts) + 1)
+
+
+def bucket_extremes(y, starts):
+    """ Sorted Indices Of The First Minimum And Maximum Of Every Bucket
+
+    Buckets are the runs of y beginning at each of starts. Missing values
+    are never chosen over real ones.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    missing = ~np.isfinite(y)
+    sizes = np.diff(np.append(starts, len(y)))
+    buckets = np.repeat(np.arange(len(starts)), sizes)
+    kept = []
+    for reduce_op, fill in ((np.minimum, np.inf), (np.maximum, -np.inf)):
+        values = np.where(missing, fill, y)
+        extremes = np.repeat(reduce_op.reduceat(values, starts), sizes)
+        # First position in each bucket holding its extreme
+        candidates = np.flatnonzero(values == extremes)
+        _, first = np.unique(buckets[candidates], return_index=True)
+        kept.append(candidates[first])
+    return np.unique(np.concatenate(kept))
+
+
+def downsample(x, y, max_points, method='lttb'):
+    """ Reduce A Series To At Most max_points Points
+
+    Returns the kept x and y values and the number of points dropped.
+    max_points must be at least 3 for 'lttb' and 4 for 'minmax'.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError("Downsample Method Must Be One Of: %s" % (DOWNSAMPLE_METHODS,))
+    x, y = np.asarray(x), np.asarray(y)
+    if method == 'lttb':
+        kept = lttb_indices(x, y, max_points)
+    else:
+        kept = minmax_indices(x, y, max_points)
+    return x[kept], y[kept], len(y) - len(kept)
@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+""" PyHighcharts encoders.py
+Vectorized encoding of numpy / pandas series data into JS array bodies.
+
+numpy is optional: without it every helper degrades to a no-op and the
+serializer falls back to per point encoding.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Stdlib Imports
+import base64, calendar, datetime, errno, hashlib, os, tempfile
+
+TIMESTAMP_MODES = ('utc', 'epoch')
+
+INT32_BOUNDS = (-2**31, 2**31 - 1)
+
+# Rebuilds series data written by encode_binary: each column is
+# [base64 little-endian buffer, 'f8' | 'i4', delta start or null]
+BINARY_DECODER = """function phcDecode(columns) {
+  var decoded = [], points, point, values, sums, raw, bytes, i, j;
+  for (j = 0; j < columns.length; j++) {
+    raw = atob(columns[j][0]);
+    bytes = new Uint8Array(raw.length);
+    for (i = 0; i < raw.length; i++) { bytes[i] = raw.charCodeAt(i); }
+    values = columns[j][1] === 'i4' ? new Int32Array(bytes.buffer) : new Float64Array(bytes.buffer);
+    if (columns[j][2] !== null) {
+      sums = new Float64Array(values.length + 1);
+      sums[0] = columns[j][2];
+      for (i = 0; i < values.length; i++) { sums[i + 1] = sums[i] + values[i]; }
+      values = sums;
+    }
+    decoded.push(values);
+  }
+  points = new Array(decoded[0].length);
+  for (i = 0; i < points.length; i++) {
+    if (decoded.length === 1) {
+      points[i] = isNaN(decoded[0][i]) ? null : decoded[0][i];
+      continue;
+    }
+    point = new Array(decoded.length);
+    for (j = 0; j < decoded.length; j++) { point[j] = isNaN(decoded[j][i]) ? null : decoded[j][i]; }
+    points[i] = point;
+  }
+  return points;
+}
+"""
+
+
+def is_array(val):
+    """ True For numpy Arrays """
+    return np is not None and isinstance(val, np.ndarray)
+
+
+def as_array(data):
+    """ Unwrap pandas containers (Series, DataFrame, Index) To Their ndarray """
+    if np is None or isinstance(data, np.ndarray):
+        return data
+    values = getattr(data, 'values', None)
+    if isinstance(values, np.ndarray):
+        return values
+    return data
+
+
+def content_digest(arrays, salt=""):
+    """ Hex sha1 Of The dtype, Shape And Bytes Of Some Arrays """
+    digest = hashlib.sha1(salt)
+    for values in arrays:
+        digest.update("%s%s" % (values.dtype.str, values.shape))
+        # Byte view: datetime64 arrays do not expose a buffer themselves
+        digest.update((values if values.flags.c_contiguous else
+                       values.copy()).view('u1'))
+    return digest.hexdigest()
+
+
+def open_temp(path):
+    """ A New File Beside path, To Be Renamed Over It: (file, its path) """
+    handle, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix='.%s.' % os.path.basename(path))
+    try:
+        # mkstemp creates the file readable by its owner alone
+        os.chmod(temp, 0o644)
+        return os.fdopen(handle, 'wb'), temp
+    except:
+        os.close(handle)
+        remove_quietly(temp)
+        raise
+
+
+def replace_file(temp, path):
+    """ Rename temp To path, Replacing A File Already There """
+    try:
+        os.rename(temp, path)
+    except OSError as err:
+        # Windows will not rename over an existing file
+        if err.errno != errno.EEXIST:
+            raise
+        os.remove(path)
+        os.rename(temp, path)
+
+
+def write_atomic(path, content):
+    """ Write content To path Through A Temporary File Renamed Into Place
+
+    Readers never see a partial file, and the temporary file is unique, so
+    processes writing the same content addressed file (render_many into
+    one directory) do not clash; the first to finish wins.
+    """
+    temp_file, temp = open_temp(path)
+    try:
+        with temp_file:
+            temp_file.write(content)
+        os.rename(temp, path)
+    except OSError as err:
+        remove_quietly(temp)
+        # Windows will not rename over an existing file
+        if err.errno != errno.EEXIST or not os.path.exists(path):
+            raise
+    except:
+        remove_quietly(temp)
+        raise
+
+
+def remove_quietly(path):
+    """ Delete path, Ignoring A File That Is Already Gone """
+    try:
+        os.remove(path)
+    except OSError as err:
+        if err.errno != errno.ENOENT:
+            raise
+
+
+def epoch_ms(value):
+    """ Integer Milliseconds Since The Unix Epoch For A datetime """
+    return calendar.timegm(value.utctimetuple())*1000 + value.microsecond//1000
+
+
+def append_point(data, point, spare=None):
+    """ data With point Added At The End, And The Array Backing It
+
+    An array becomes a view of spare, which is reallocated twice as long
+    as needed once full, so appending n points copies O(n) values in all.
+    The dtype widens to hold point (an int array taking 3.7 turns float).
+    Other data is appended to as a list (the spare returned is None).
+    """
+    if not is_array(data):
+        data = data if isinstance(data, list) else list(data)
+        data.append(point)
+        return data, None
+    if point is None or data.dtype.kind in 'Mm':
+        # None is NaN in float data; dates take the array's unit
+        value = np.asarray(point, dtype=data.dtype)
+    else:
+        value = np.asarray(point)
+    dtype = np.result_type(data, value)
+    size = len(data)
+    if spare is None or spare.dtype != dtype or size >= len(spare) or \
+            spare.shape[1:] != data.shape[1:] or \
+            spare[:size].__array_interface__ != data.__array_interface__:
+        spare = np.empty((max(2*size, 16),) + data.shape[1:], dtype=dtype)
+        spare[:size] = data
+    spare[size] = value
+    return spare[:size + 1], spare
+
+
+def naive_utc(value):
+    """ Naive UTC datetime For A date / datetime (None Is Kept) """
+    if value is None or not isinstance(value, datetime.datetime):
+        if value is None:
+            return None
+        return datetime.datetime(value.year, value.month, value.day)
+    offset = value.utcoffset()
+    value = value.replace(tzinfo=None)
+    return value - offset if offset else value
+
+
+def to_datetime64(values):
+    """ datetime64[ms] View Of Dates Given In Any Supported Container
+
+    Accepts pandas DatetimeIndex / datetime Series, datetime64 arrays and
+    sequences of python dates or datetimes (naive ones are taken as UTC).
+    """
+    asi8 = getattr(values, 'asi8', None)
+    if asi8 is not None:
+        # pandas stores datetimes as UTC nanoseconds, NaT included
+        return asi8.view('datetime64[ns]').astype('datetime64[ms]')
+    values = as_array(values)
+    if not is_array(values) or values.dtype.kind != 'M':
+        values = np.array([naive_utc(v) for v in values], dtype='datetime64[ms]')
+    return values.astype('datetime64[ms]', copy=False)
+
+
+def to_epoch_ms(values):
+    """ Convert Dates To An Array Of Epoch Milliseconds In One Pass
+
+    Returns int64 milliseconds, or float64 with NaN in place of NaT when
+    any date is missing.
+    """
+    values = to_datetime64(values)
+    millis = values.view(np.int64)
+    missing = np.isnat(values)
+    if missing.any():
+        millis = millis.astype(np.float64)
+        millis[missing] = np.nan
+    return millis
+
+
+def regular_step(x):
+    """ (start, step) If x Increases By A Constant Step, Else None
+
+    datetime64 values are taken as epoch milliseconds. Integer steps must
+    be exact, float ones equal to within rounding.
+    """
+    if not is_array(x) or x.ndim != 1 or len(x) < 2:
+        return None
+    if x.dtype.kind == 'M':
+        x = to_epoch_ms(x)
+    if x.dtype.kind not in 'iuf':
+        return None
+    if x.dtype.kind == 'u':
+        # Differences of unsigned integers would wrap around
+        x = x.astype(np.int64)
+    steps = np.diff(x)
+    step = steps[0]
+    if not step > 0:
+        return None
+    if x.dtype.kind == 'f':
+        if not (np.isfinite(x[0]) and
+                np.allclose(steps, step, rtol=1e-9, atol=0)):
+            return None
+        step = (x[-1] - x[0]) / (len(x) - 1)
+    elif (steps != step).any():
+        return None
+    return x[0].item(), step.item()
+
+
+def round_values(values, precision=None, decimals=None):
+    """ Float Values Rounded To precision Significant Digits Or To decimals
+    Decimal Places
+
+    Each rounded value is the double nearest to its short decimal form,
+    so it encodes without noise digits. A column left holding whole
+    numbers only comes back as int64. Other arrays are returned as is.
+    """
+    if (precision is None and decimals is None) or not is_array(values) or \
+            values.dtype.kind != 'f':
+        return values
+    if decimals is not None:
+        rounded = np.round(values, decimals)
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            magnitude = np.floor(np.log10(np.abs(values)))
+        shift = precision - 1 - np.where(np.isfinite(magnitude), magnitude, 0)
+        # Powers of ten up to 1e22 are exact, so either way one rounding
+        # step gives the nearest double to the short decimal
+        wide = np.abs(shift) > 22
+        scale = 10.0 ** np.minimum(np.abs(shift), 22)
+        with np.errstate(over='ignore', invalid='ignore'):
+            rounded = np.where(shift >= 0, np.round(values * scale) / scale,
+                               np.round(values / scale) * scale)
+        rounded = np.where(np.isfinite(rounded), rounded, values)
+        if wide.any():
+            # Rare extreme magnitudes go through the string formatter
+            rounded[wide] = [float("%.*g" % (precision, value))
+                             for value in values[wide]]
+    if len(rounded) and np.isfinite(rounded).all() and \
+            (rounded == np.trunc(rounded)).all() and \
+            np.abs(rounded).max() < 2**53:
+        return rounded.astype(np.int64)
+    return rounded
+
+
+def encode_column(values):
+    """ Encode A 1-D Array To An Array Of JS Literals
+
+    Returns None when the dtype has no vectorized encoding (object arrays
+    etc.), in which case the caller should fall back to per point encoding.
+    """
+    kind = values.dtype.kind
+    if kind == 'b':
+        return np.where(values, 'true', 'false')
+    elif kind in 'iu':
+        return values.astype(str)
+    elif kind == 'f':
+        literals = values.astype(str)
+        literals[~np.isfinite(values)] = 'null'
+        return literals
+    elif kind == 'M':
+        values = values.astype('datetime64[ms]')
+        literals = values.astype(np.int64).astype(str)
+        literals[np.isnat(values)] = 'null'
+        return literals
+    return None
+
+
+def encode_array(values):
+    """ Comma Separated Body Of A JS Array For 1-D Or 2-D Data
+
+    1-D arrays are encoded as plain values, 2-D arrays as one [a,b,...]
+    point per row ([x, y], [low, high], ...). Returns None if the array
+    cannot be encoded in bulk.
+    """
+    if values.ndim == 1:
+        literals = encode_column(values)
+        if literals is None:
+            return None
+        return ",".join(literals.tolist())
+    elif values.ndim == 2:
+        return encode_points([values[:, i] for i in range(values.shape[1])])
+    return None
+
+
+def encode_points(columns):
+    """ Comma Separated [a,b,...] Points Built Row-Wise From 1-D Columns
+
+    The columns may differ in dtype (e.g. int64 x, float64 y). Returns
+    None if any of them cannot be encoded in bulk.
+    """
+    rows, cols = len(columns[0]), len(columns)
+    if not rows:
+        return ""
+    pieces = np.empty((rows, 2*cols), dtype=object)
+    for i, column in enumerate(columns):
+        literals = encode_column(column)
+        if literals is None:
+            return None
+        pieces[:, 2*i] = literals
+        pieces[:, 2*i+1] = ","
+    pieces[:, -1] = "],["
+    return "[" + "".join(pieces.ravel().tolist())[:-2]
+
+
+def fits_int32(values):
+    """ True If An Integer Array Can Be Stored As Int32 """
+    return not len(values) or (values.min() >= INT32_BOUNDS[0] and
+                               values.max() <= INT32_BOUNDS[1])
+
+
+def binary_column(values, delta=False):
+    """ [buffer, type, start] Literal For One Column Of encode_binary """
+    if values.dtype.kind == 'M':
+        values = to_epoch_ms(values)
+    start = 'null'
+    if delta and values.dtype.kind in 'iu' and len(values) and \
+            (values[1:] >= values[:-1]).all():
+        start = str(values[0])
+        values = np.diff(values)
+    if values.dtype.kind in 'iu' and fits_int32(values):
+        dtype = 'i4'
+    else:
+        dtype = 'f8'
+    buf = base64.b64encode(values.astype('<' + dtype).tobytes())
+    return "['%s','%s',%s]" % (buf, dtype, start)
+
+
+def is_binary_encodable(values):
+    """ True For 1-D Or 2-D Numeric / datetime64 Arrays """
+    return values.dtype.kind in 'iufM' and values.ndim in (1, 2)
+
+
+def encode_binary(values, delta_x=False):
+    """ JS Expression Rebuilding 1-D Or 2-D Numeric Data From Typed Arrays
+
+    Columns are written as base64 little-endian Int32 (integers that fit)
+    or Float64 buffers, decoded in the browser by BINARY_DECODER. With
+    delta_x a monotonic integer x column (e.g. epoch milliseconds) is
+    stored as differences from its first value. Returns None if the
+    array is not numeric.
+    """
+    if not is_binary_encodable(values):
+        return None
+    if values.ndim == 1:
+        return encode_binary_columns([values])
+    return encode_binary_columns([values[:, i] for i in range(values.shape[1])],
+                                 delta_x=delta_x)
+
+
+def encode_binary_columns(columns, delta_x=False):
+    """ encode_binary For Separate 1-D Columns: One Column Decodes To Plain
+    Values, Several To [a,b,...] Points With The First One As x """
+    if not all(is_binary_encodable(column) for column in columns):
+        return None
+    delta = delta_x and len(columns) > 1
+    return "phcDecode([%s])" % ",".join(
+        binary_column(column, delta=delta and i == 0)
+        for i, column in enumerate(columns))
@@ -6,6 +6,10 @@ except ImportError:
 	except ImportError:
 		import simplejson as json
 
+import collections
+import datetime
+
+from encoders import as_array, append_point, epoch_ms, is_array, naive_utc, np
 
 
 
@@ -211,6 +215,28 @@ PLOT_OPTION_ALLOWED_ARGS = {
 		"step": str,
 		"turboThreshold": int,
 	},
+	"ohlc": {
+		"allowPointSelect": bool,
+		"cropThreshold": int,
+		"dataGrouping": dict,
+		"lineWidth": int,
+		"pointInterval": int,
+		"pointStart": (int,str),
+		"shadow": bool,
+		"turboThreshold": int,
+		"upColor": str,
+	},
+	"candlestick": {
+		"allowPointSelect": bool,
+		"cropThreshold": int,
+		"dataGrouping": dict,
+		"lineWidth": int,
+		"pointInterval": int,
+		"pointStart": (int,str),
+		"shadow": bool,
+		"turboThreshold": int,
+		"upColor": str,
+	},
 	"pie": {
 		"allowPointSelect": bool,
 		"borderColor": str,
@@ -245,6 +271,20 @@ PLOT_OPTION_ALLOWED_ARGS = {
 		"dataLabels": dict,
 		"showInLegend": bool
 	},
+	"bubble": {
+		"allowPointSelect": bool,
+		"cropThreshold": int,
+		"displayNegative": bool,
+		"marker": dict,
+		"maxSize": (int,str),
+		"minSize": (int,str),
+		"shadow": bool,
+		"sizeBy": str,
+		"turboThreshold": int,
+		"zMax": (int,float),
+		"zMin": (int,float),
+		"zThreshold": (int,float),
+	},
 	"scatter": {
 		"allowPointSelect": bool,
 		"connectNulls": bool,
@@ -297,6 +337,8 @@ DATA_SERIES_ALLOWED_OPTIONS = {
 	"index": int,
 	"legendIndex": int,
 	"name": str,
+	"pointInterval": (int,long,float),
+	"pointStart": (int,long,float,str),
 	"stack": str,
 	"type": str,
 	"xAxis": int,
@@ -310,46 +352,224 @@ DEFAULT_OPTIONS = {
 
 }
 
+# Types spelled by name in the option tables
+TYPE_NAMES = {
+	"str": str,
+}
+
 class OptionTypeError(Exception):
 
 	def __init__(self,*args):
 		self.args = args
 
 
-class SeriesOptions(object):
+def type_check(key,spec,allow_empty=False):
+	""" Compile One Option Table Entry Into A value -> bool Validator
 
-	def __init__(self,series_type="line",supress_errors=False,**kwargs):
-		self.load_defaults(series_type)
-		self.process_kwargs(kwargs,series_type=series_type,supress_errors=supress_errors)
-
-	@staticmethod
-	def __validate_options__(k,v,ov):
-		if isinstance(ov,list):
-			for o in ov:
-				if isinstance(v,o): return True
-			else:
-				raise OptionTypeError("Option Type Currently Not Supported: %s" % k)
-		else:
-			if ov == NotImplemented: raise OptionTypeError("Option Type Currently Not Supported: %s" % k)
-			if isinstance(v,ov): return True
-			else: return False
+	NotImplemented entries raise OptionTypeError, dict entries accept a
+	dict whose every key passes its own entry and allow_empty accepts any
+	falsy value.
+	"""
+	if spec is NotImplemented:
+		def check(value):
+			raise OptionTypeError("Option Type Currently Not Supported: %s" % key)
+		return check
+	if isinstance(spec,dict):
+		checks = compile_checks(spec)
+		return lambda value: isinstance(value,dict) and \
+			all(k in checks and checks[k](v) for k, v in value.items())
+	if isinstance(spec,list):
+		spec = tuple(spec)
+	spec = TYPE_NAMES.get(spec,spec)
+	if allow_empty:
+		return lambda value: isinstance(value,spec) or not value
+	return lambda value: isinstance(value,spec)
+
+
+def compile_checks(table,allow_empty=False):
+	""" {option: validator} For A Whole Option Table """
+	return dict((key, type_check(key,spec,allow_empty)) for key, spec in table.items())
+
+
+def checked_options(kwargs,checks,table,supress_errors=False,trusted=False,not_allowed="%s"):
+	""" The Entries Of kwargs Passing checks (Compiled From table)
+
+	Failing entries raise OptionTypeError unless supress_errors; trusted
+	skips the type checks but still drops unknown options, whose error
+	message is not_allowed formatted with their name.
+	"""
+	accepted = {}
+	for k, v in kwargs.items():
+		check = checks.get(k)
+		if check is None:
+			if not supress_errors: raise OptionTypeError(not_allowed % k)
+		elif trusted or check(v):
+			accepted[k] = v
+		elif not supress_errors:
+			raise OptionTypeError("Option Type Mismatch: Expected: %s" % table[k])
+	return accepted
+
+
+PLOT_OPTION_CHECKS = dict((series_type, compile_checks(args))
+	for series_type, args in PLOT_OPTION_ALLOWED_ARGS.items())
+
+DATA_SERIES_CHECKS = compile_checks(DATA_SERIES_ALLOWED_OPTIONS)
+
+# Series types whose two value points are [x, y]; range types (arearange,
+# columnrange, ...) read them as [low, high]
+XY_SERIES_TYPES = ("area", "areaspline", "bar", "column", "line", "scatter", "spline")
+
+
+class OptionStore(object):
+	""" Keeps Options In self._options Next To A Version Counter And The Last
+	Rendered Fragment, So Unchanged Objects Need Not Be Reserialized.
+
+	Assignments and option updates are tracked; in-place edits of a nested
+	value (e.g. series.data.append) need a call to __changed__() """
+
+	# Public attributes that are not options (kept out of self._options)
+	ATTRIBUTES = ()
+
+	# No per-instance __dict__: subclasses declare their own __slots__,
+	# charts hold thousands of these objects. Option groups keep their
+	# options in an '_options' dict slot, Series in a slot per option
+	__slots__ = ('_version', '_fragment')
+
+	def __init__(self):
+		init = object.__setattr__   # Bypasses __setattr__
+		init(self, '_version', 0)
+		init(self, '_fragment', None)
+		self.__init_options__()
+
+	def __init_options__(self):
+		""" Start With No Options """
+		object.__setattr__(self, '_options', {})
 
 	def __options__(self):
-		return self.__dict__
+		return self._options
+
+	def __getattr__(self,item):
+		# Unset slots land here too; '_' names never recurse into _options
+		if item.startswith('_'):
+			raise AttributeError(item)
+		try:
+			return self._options[item]
+		except KeyError:
+			raise AttributeError(item)
+
+	def __setattr__(self,item,value):
+		if item.startswith('_'):
+			object.__setattr__(self,item,value)
+		elif item in self.ATTRIBUTES:
+			object.__setattr__(self,item,value)
+			self.__changed__()
+		else:
+			self._options[item] = value
+			self.__changed__()
+
+	def __changed__(self):
+		""" Mark As Changed Since The Last Serialization """
+		object.__setattr__(self, '_version', self._version + 1)
+		object.__setattr__(self, '_fragment', None)
+
+	def __state__(self):
+		""" Changes Whenever This Object Or A Nested OptionStore Changes """
+		children = tuple(v.__state__() for v in self._options.values() if isinstance(v,OptionStore))
+		return (self._version, children) if children else self._version
+
+	def __cached__(self,key):
+		""" Last Rendered Fragment If It Was Rendered Under key """
+		if self._fragment is not None and self._fragment[0] == key:
+			return self._fragment[1]
+
+	def __cache__(self,key,fragment):
+		self._fragment = (key, fragment)
+
+	def __getstate__(self):
+		# Slotted objects have no __dict__ for pickle / copy to fall back on
+		return dict((name, getattr(self, name)) for cls in type(self).__mro__
+			for name in cls.__dict__.get('__slots__', ()) if hasattr(self, name))
+
+	def __setstate__(self,state):
+		for name, value in state.items():
+			object.__setattr__(self, name, value)
+
+
+class SlotOptions(collections.MutableMapping):
+	""" dict View Of An OptionStore Keeping Each Known Option In A Slot:
+	Unset Slots Are Missing Keys, Other Options Go To Its _extra dict """
+
+	__slots__ = ('store',)
+
+	def __init__(self,store):
+		self.store = store
+
+	def __getitem__(self,key):
+		slot = self.store.OPTION_SLOTS.get(key)
+		if slot is None:
+			extra = self.store._extra
+			if extra is None:
+				raise KeyError(key)
+			return extra[key]
+		try:
+			return slot.__get__(self.store, None)
+		except AttributeError:
+			raise KeyError(key)
+
+	def __setitem__(self,key,value):
+		slot = self.store.OPTION_SLOTS.get(key)
+		if slot is not None:
+			slot.__set__(self.store, value)
+		elif self.store._extra is None:
+			object.__setattr__(self.store, '_extra', {key: value})
+		else:
+			self.store._extra[key] = value
+
+	def __delitem__(self,key):
+		slot = self.store.OPTION_SLOTS.get(key)
+		if slot is None:
+			if self.store._extra is None:
+				raise KeyError(key)
+			del self.store._extra[key]
+			return
+		try:
+			slot.__delete__(self.store)
+		except AttributeError:
+			raise KeyError(key)
+
+	def __iter__(self):
+		for key in self.store.OPTION_NAMES:
+			try:
+				self.store.OPTION_SLOTS[key].__get__(self.store, None)
+			except AttributeError:
+				continue
+			yield key
+		if self.store._extra is not None:
+			for key in self.store._extra:
+				yield key
+
+	def __len__(self):
+		return sum(1 for _ in self)
+
+
+class SeriesOptions(OptionStore):
+
+	__slots__ = ('_options',)
+
+	def __init__(self,series_type="line",supress_errors=False,trusted=False,**kwargs):
+		OptionStore.__init__(self)
+		self.load_defaults(series_type)
+		self.process_kwargs(kwargs,series_type=series_type,supress_errors=supress_errors,
+			trusted=trusted)
 
 	def __display_options__(self):
 		print json.dumps(self.__options__(),indent=4,sort_keys=True)
 
-	def process_kwargs(self,kwargs,series_type,supress_errors=False):
-		allowed_args = PLOT_OPTION_ALLOWED_ARGS[series_type]
-		for k, v in kwargs.items():
-			if k in allowed_args:
-				if SeriesOptions.__validate_options__(k,v,allowed_args[k]):
-					self.__dict__.update({k:v})
-				else: 
-					if not supress_errors: raise OptionTypeError("Option Type Mismatch: Expected: %s" % allowed_args[k])
-			else: 
-				if not supress_errors: raise OptionTypeError("Option: %s Not Allowed For Series Type: %s" % (k,series_type))
+	def process_kwargs(self,kwargs,series_type,supress_errors=False,trusted=False):
+		self._options.update(checked_options(kwargs,PLOT_OPTION_CHECKS[series_type],
+			PLOT_OPTION_ALLOWED_ARGS[series_type],supress_errors,trusted,
+			"Option: %%s Not Allowed For Series Type: %s" % series_type))
+		self.__changed__()
 
 	def load_defaults(self,series_type):
 		self.process_kwargs(DEFAULT_OPTIONS.get(series_type,{}),series_type)
@@ -361,25 +581,97 @@ class HighchartsError(Exception):
 		self.args = args
 
 
-class MultiAxis(object):
+class MultiAxis(OptionStore):
+
+	__slots__ = ('_options',)
 
 	def __init__(self, axis):
+		OptionStore.__init__(self)
 		self.axis = axis
 
+	def __state__(self):
+		return (self._version, tuple(ax.__state__() for ax in self.axis))
+
+
+class Series(OptionStore):
+	""" One Data Series; data Holds y Values Alone When x Is Given Apart """
+
+	ATTRIBUTES = ('x', 'points_dropped', 'precision', 'decimals')
+
+	# A slot per option, read without the __getattr__ fallback; options
+	# set without checks (e.g. force_options) land in the _extra dict
+	OPTION_NAMES = ('type', 'data') + tuple(sorted(set(DATA_SERIES_ALLOWED_OPTIONS) - set(['type'])))
+	# _spares holds the arrays that appended points grow into
+	__slots__ = ATTRIBUTES + OPTION_NAMES + ('_extra', '_spares')
+
+	def __init__(self,data,series_type="line",supress_errors=False,x=None,trusted=False,**kwargs):
+		OptionStore.__init__(self)
+		init = object.__setattr__   # Bypasses __setattr__
+		init(self, 'x', as_array(x))
+		init(self, 'points_dropped', 0)
+		init(self, 'precision', None)
+		init(self, 'decimals', None)
+		init(self, 'data', as_array(data))
+		init(self, 'type', series_type)
+		self._options.update(checked_options(kwargs,DATA_SERIES_CHECKS,
+			DATA_SERIES_ALLOWED_OPTIONS,supress_errors,trusted,
+			"Option: %%s Not Allowed For Data Series: %s" % series_type))
+
+	def __init_options__(self):
+		object.__setattr__(self, '_extra', None)
+		object.__setattr__(self, '_spares', None)
+
+	def __getstate__(self):
+		# Spare capacity is rebuilt by the next add_point, not pickled
+		state = OptionStore.__getstate__(self)
+		state['_spares'] = None
+		return state
+
+	@property
+	def _options(self):
+		return SlotOptions(self)
+
+	def __options__(self):
+		# A plain dict: callers iterate it in the order dicts always had
+		return dict(self._options)
 
-class Series(object):
+	def add_point(self,point):
+		""" Append One Point To The Series Data """
+		if self.x is None and 'pointInterval' in self._options and \
+				isinstance(point,(tuple,list)) and len(point) == 2 and \
+				is_array(self.data) and self.data.ndim == 1:
+			point = self.__interval_point__(point)
+		spares = self._spares or {}
+		if self.x is not None:
+			try:
+				x, point = point
+			except (TypeError, ValueError):
+				raise HighchartsError("Series With A Separate x Takes [x, y] Points")
+			x, spares['x'] = append_point(self.x,x,spares.get('x'))
+			object.__setattr__(self, 'x', x)
+		data, spares['data'] = append_point(self.data,point,spares.get('data'))
+		object.__setattr__(self, '_spares', spares)
+		self.data = data
 
-	def __init__(self,data,series_type="line",supress_errors=False,**kwargs):
-		self.__dict__.update({
-			"data": data,
-			"type": series_type,
-			})
-		for k, v in kwargs.items():
-			if k in DATA_SERIES_ALLOWED_OPTIONS:
-				if SeriesOptions.__validate_options__(k,v,DATA_SERIES_ALLOWED_OPTIONS[k]):
-					self.__dict__.update({k:v})
-				else:
-					if not supress_errors: raise OptionTypeError("Option Type Mismatch: Expected: %s" % DATA_SERIES_ALLOWED_OPTIONS[k])
-			else:
-				if not supress_errors: raise OptionTypeError("Option: %s Not Allowed For Data Series: %s" % (k, series_type))
+	def __interval_point__(self,point):
+		""" An [x, y] Point For A Series Written With pointStart /
+		pointInterval: y Alone If x Is The Next Step, Else The Point (Dates
+		As Epoch ms), With The Implied x Column Restored To Take Any x """
+		options = self._options
+		start, step = options.get('pointStart', 0), options['pointInterval']
+		x = point[0]
+		if isinstance(x, datetime.date):
+			x = epoch_ms(naive_utc(x))
+		if not all(isinstance(v,(int,long,float)) for v in (start, step, x)):
+			return point
+		expected = start + step*len(self.data)
+		if x == expected or (isinstance(expected, float) and
+				abs(x - expected) <= 1e-9*abs(step)):
+			return point[1]
+		object.__setattr__(self, 'x', start + step*np.arange(len(self.data)))
+		options.pop('pointStart', None)
+		options.pop('pointInterval')
+		return (x, point[1])
 
+# Slot descriptor of each option, for SlotOptions
+Series.OPTION_SLOTS = dict((name, Series.__dict__[name]) for name in Series.OPTION_NAMES)
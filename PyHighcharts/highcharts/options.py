@@ -7,7 +7,7 @@ except ImportError:
         import simplejson as json
 
 
-from highchart_types import OptionTypeError, Series, SeriesOptions
+from highchart_types import OptionTypeError, OptionStore, Series, SeriesOptions, type_check
 from common import Formatter, Event
 
 
@@ -15,60 +15,108 @@ from common import Formatter, Event
 
 # Base Option Class
 
-class BaseOptions(object):
+class BaseOptions(OptionStore):
+    __slots__ = ('_options',)
 
     def __init__(self,**kwargs):
+        OptionStore.__init__(self)
         self.update_dict(**kwargs)
 
     def __display_options__(self):
-        print json.dumps(self.__dict__,indent=4,sort_keys=True)
-
-    def __validate_options__(self,k,v,ov):
-        if ov == NotImplemented: 
-            raise OptionTypeError("Option Type Currently Not Supported: %s" % k)
-        if isinstance(v,dict) and isinstance(ov,dict):
-            keys = v.keys()
-            if len(keys) > 1: 
-                raise NotImplementedError
-            return isinstance(v[keys[0]],ov[keys[0]])
-        return isinstance(v, ov) 
+        print json.dumps(self._options,indent=4,sort_keys=True)
+
+    @classmethod
+    def __schema__(cls):
+        """ ALLOWED_OPTIONS Compiled Once Per Class
+
+        Maps every accepted key, nested "group_name" paths included, to
+        (group, name, type, validator); a group itself maps to (group,
+        None, dict, None) and takes a dict of its options.
+        """
+        schema = cls.__dict__.get('_schema')
+        if schema is None:
+            schema = {}
+            for name, spec in cls.ALLOWED_OPTIONS.items():
+                if isinstance(spec, dict):
+                    schema[name] = (name, None, dict, None)
+                    for sub, sub_spec in spec.items():
+                        schema[name + "_" + sub] = (name, sub, sub_spec,
+                            type_check(sub, sub_spec, allow_empty=True))
+                else:
+                    schema[name] = (None, name, spec,
+                        type_check(name, spec, allow_empty=True))
+            cls._schema = schema
+        return schema
 
     def update_dict(self,**kwargs):
-        for k, v in kwargs.items(): 
-            k = k.split("_")
-            if k[0] in self.ALLOWED_OPTIONS:
-                if isinstance(self.ALLOWED_OPTIONS[k[0]],dict):
-                    if len(k) > 2:  
-                        raise NotImplementedError
-                    else:
-                        if self.__validate_options__(k[1],v,self.ALLOWED_OPTIONS[k[0]][k[1]]) or not v:
-                            if not k[0] in self.__dict__:
-                                self.__dict__.update({k[0]:{}})
-                            self.__dict__[k[0]].update({k[1]:v})
-                        else: 
-                            print k, v
-                            raise OptionTypeError("Option Type Mismatch: Expected: %s" % self.ALLOWED_OPTIONS[k[0]][k[1]]) 
-                else:
-                    if self.__validate_options__(k[0],v,self.ALLOWED_OPTIONS[k[0]]) or not v:
-                        if isinstance(v,dict) and isinstance(self.ALLOWED_OPTIONS[k[0]],dict):
-                            self.__dict__.update({k[0]:{v[v.keys()[0]]:v.values()[0]}})
-                        else:
-                            self.__dict__.update({k[0]:v})
-                    else:
-                        print k, v, self.ALLOWED_OPTIONS
-                        raise OptionTypeError("Option Type Mismatch: Expected: %s" % self.ALLOWED_OPTIONS[k[0]])
+        self.update_options(kwargs)
+
+    def update_options(self, options, trusted=False):
+        """ Validate And Store Many Options In One Pass
+
+        Keys are option names, "group_name" paths into option groups or
+        group names given a dict of their options. trusted skips the type
+        checks (for machine generated configs); keys are still resolved.
+        Nothing is stored unless every option is valid.
+        """
+        self.__store_options__(self.__stage_options__(options, trusted))
+
+    def __stage_options__(self, options, trusted=False):
+        """ Validate Options Without Storing Them: The (group, name, value)
+        Entries __store_options__ Takes """
+        staged = []
+        if options:
+            schema = self.__schema__()
+            for key, value in options.items():
+                self.__stage_option__(schema, key, value, trusted, staged)
+        return staged
+
+    def __store_options__(self, staged):
+        if not staged:
+            return
+        for group, name, value in staged:
+            if group is None:
+                self._options[name] = value
+            else:
+                self._options.setdefault(group, {})[name] = value
+        self.__changed__()
+
+    @staticmethod
+    def __nested_options__(staged):
+        """ Staged Entries As The Nested Dict Highcharts Takes """
+        nested = {}
+        for group, name, value in staged:
+            if group is None:
+                nested[name] = value
             else:
-                print self.ALLOWED_OPTIONS
-                print self.__name__
-                print k, v
-                raise OptionTypeError("Not An Accepted Option Type: %s" % k[0])
+                nested.setdefault(group, {})[name] = value
+        return nested
+
+    def __stage_option__(self, schema, key, value, trusted, staged):
+        """ Validate One Option, Adding (group, name, value) To staged """
+        entry = schema.get(key)
+        if entry is None:
+            raise OptionTypeError("Not An Accepted Option Type: %s" % key)
+        group, name, spec, check = entry
+        if name is None:
+            if not isinstance(value, dict):
+                raise OptionTypeError("Option Type Mismatch: Expected: %s" % spec)
+            for sub, sub_value in value.items():
+                self.__stage_option__(schema, group + "_" + sub, sub_value,
+                    trusted, staged)
+            return
+        if not trusted and not check(value):
+            raise OptionTypeError("Option Type Mismatch: Expected: %s" % spec)
+        staged.append((group, name, value))
 
     def __getattr__(self,item):
-        if not item in self.__dict__:
-            return None # Attribute Not Set
+        if item.startswith('_'):
+            raise AttributeError(item)
+        return self._options.get(item) # None If Not Set
 
 
 class ChartOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "alignTicks": bool,
         "animation": bool,
@@ -112,9 +160,12 @@ class ChartOptions(BaseOptions):
 
 class ColorsOptions(BaseOptions):
     """ Special Case, this is simply just an array of colours """
+    __slots__ = ()
+
     def __init__(self):
+        OptionStore.__init__(self)
         # Predefined Colors
-        self.__dict__.update({"colors":[
+        self._options.update({"colors":[
            '#2f7ed8', 
            '#0d233a', 
            '#8bbc21', 
@@ -128,10 +179,12 @@ class ColorsOptions(BaseOptions):
         ]})
 
     def set_colors(self,colors):
-        self.__dict__.update({"colors":colors})
+        self._options.update({"colors":colors})
+        self.__changed__()
 
 
 class CreditsOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "enabled": bool,
         "href": str,
@@ -142,6 +195,7 @@ class CreditsOptions(BaseOptions):
 
 
 class ExportingOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "buttons": NotImplemented,
         "chartOptions": NotImplemented,
@@ -154,6 +208,7 @@ class ExportingOptions(BaseOptions):
 
 
 class GlobalOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "VMLRadialGradientURL": str,
         "canvasToolsURL": str,
@@ -162,6 +217,7 @@ class GlobalOptions(BaseOptions):
 
 
 class LabelsOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "items": NotImplemented,
         "style": NotImplemented,
@@ -169,6 +225,7 @@ class LabelsOptions(BaseOptions):
 
 
 class LangOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "decimalPoint": str,
         "downloadJPEG": str,
@@ -189,6 +246,7 @@ class LangOptions(BaseOptions):
 
 
 class LegendOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "align": str,
         "backgroundColor": str,
@@ -228,6 +286,7 @@ class LegendOptions(BaseOptions):
 
 
 class LoadingOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "hideDuration": int,
         "labelStyle": NotImplemented,
@@ -237,6 +296,7 @@ class LoadingOptions(BaseOptions):
 
 
 class NavigationOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "buttonOptions": NotImplemented,
         "menuItemHoverStyle": NotImplemented,
@@ -246,6 +306,7 @@ class NavigationOptions(BaseOptions):
 
 
 class PaneOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "background": list,
         "center": list,
@@ -256,6 +317,7 @@ class PaneOptions(BaseOptions):
 
 class PlotOptions(BaseOptions):
     """ Another Special Case: Interface With all the different Highchart Plot Types Here """
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "area": SeriesOptions,
         "arearange": SeriesOptions,
@@ -271,15 +333,22 @@ class PlotOptions(BaseOptions):
         "series": SeriesOptions,
         "spline": SeriesOptions,
         "boxplot": SeriesOptions,
+        "bubble": SeriesOptions,
+        "ohlc": SeriesOptions,
+        "candlestick": SeriesOptions,
     }
 
 
 class SeriesData(BaseOptions):
     """ Another Special Case: Stores Data Series in an array for returning to the chart object """
+    __slots__ = ()
+
     def __init__(self):
-        self.__dict__.update({"data":[]})
+        OptionStore.__init__(self)
+        self._options.update({"data":[]})
 
 class SubtitleOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "align": str,
         "floating": bool,
@@ -293,6 +362,7 @@ class SubtitleOptions(BaseOptions):
 
 
 class TitleOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "align": str,
         "floating": bool,
@@ -309,6 +379,7 @@ class TitleOptions(BaseOptions):
 
 
 class TooltipOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "animation": bool,
         "backgroundColor": str,
@@ -334,6 +405,7 @@ class TooltipOptions(BaseOptions):
 
 
 class xAxisOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "allowDecimals": bool,
         "alternateGridColor": str,
@@ -416,6 +488,7 @@ class xAxisOptions(BaseOptions):
 
 
 class yAxisOptions(BaseOptions):
+    __slots__ = ()
     ALLOWED_OPTIONS = {
         "allowDecimals": bool,
         "alternateGridColor": str,
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+""" PyHighcharts pyramid.py
+Multi-resolution data pyramids for long Highstock series.
+
+Every level aggregates the series into buckets a factor narrower than the
+level above it, down to the raw points. The page only embeds the coarsest
+level; the others are written as JSON chunk files next to it and fetched
+by the browser when the x axis is zoomed (afterSetExtremes).
+
+Requires numpy.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from PyHighcharts.highcharts.downsample import bucket_extremes
+from PyHighcharts.highcharts.encoders import as_array, is_array, \
+    encode_points, to_epoch_ms
+
+# Stdlib Imports
+import json, os
+
+PYRAMID_METHODS = ('mean', 'minmax', 'ohlc')
+
+# Called from the chart load event with the chart, the URL prefix of the
+# chunk files and one manifest per series:
+# {series: index, points: max points shown, levels: [{width: bucket
+# width, chunks: [[first x, last x, file], ...]}, ...]} (coarse to fine)
+PYRAMID_LOADER = """function (chart, base, manifests) {
+  var initial = [], i;
+  for (i = 0; i < manifests.length; i++) {
+    initial.push(chart.series[manifests[i].series].options.data.slice());
+  }
+  if (chart.update) {
+    chart.update({navigator: {adaptToUpdatedData: false},
+                  scrollbar: {liveRedraw: false}}, false);
+  }
+  Highcharts.addEvent(chart.xAxis[0], 'afterSetExtremes', function (e) {
+    $.each(manifests, function (i, manifest) {
+      var series = chart.series[manifest.series], level = null, requests = [],
+          token = manifest.token = (manifest.token || 0) + 1;
+      $.each(manifest.levels, function (j, candidate) {
+        if ((e.max - e.min) / candidate.width <= manifest.points) { level = candidate; }
+      });
+      if (level === null) {
+        series.setData(initial[i].slice());
+        return;
+      }
+      $.each(level.chunks, function (j, chunk) {
+        if (chunk[1] >= e.min && chunk[0] <= e.max) { requests.push($.getJSON(base + chunk[2])); }
+      });
+      $.when.apply($, requests).done(function () {
+        var results = requests.length === 1 ? [arguments] : arguments, points = [], k;
+        if (token !== manifest.token) { return; }
+        for (k = 0; k < results.length; k++) { points = points.concat(results[k][0]); }
+        series.setData(points);
+      });
+    });
+  });
+}"""
+
+
+def series_columns(data_set):
+    """ Sorted Numeric (x, y) Columns Of A Series, Else None
+
+    datetime x values become epoch milliseconds; y-only data with a
+    numeric pointStart and pointInterval gets the x values they imply.
+    """
+    if np is None:
+        return None
+    x, y = as_array(data_set.x), as_array(data_set.data)
+    options = data_set.__options__()
+    start, step = options.get('pointStart'), options.get('pointInterval')
+    if x is None and is_array(y) and y.ndim == 1 and \
+            isinstance(start, (int, long, float)) and step is not None:
+        x = start + step * np.arange(len(y))
+    elif x is None:
+        if not is_array(y) or y.ndim != 2 or y.shape[1] != 2:
+            return None
+        x, y = y[:, 0], y[:, 1]
+    x, y = np.asarray(x), np.asarray(y)
+    if x.dtype.kind == 'M':
+        x = to_epoch_ms(x)
+    if x.ndim != 1 or y.ndim != 1 or x.dtype.kind not in 'iuf' or \
+            y.dtype.kind not in 'iufb' or len(x) < 2:
+        return None
+    if not np.isfinite(x).all() or (x[1:] < x[:-1]).any():
+        return None
+    return x, y.astype(np.float64)
+
+
+def bucket_starts(x, width):
+    """ First Index Of Every Non Empty Bucket Of The Given Width """
+    ids = np.floor((x - x[0]) / float(width)).astype(np.int64)
+    return np.append(0, np.flatnonzero(np.diff(ids)) + 1)
+
+
+def aggregate(x, y, width, how='mean'):
+    """ Columns Of x / y Aggregated Into Buckets Of The Given Width
+
+    'mean' gives the mean point of every bucket, 'minmax' its first
+    minimum and maximum and 'ohlc' [x, open, high, low, close] points.
+    """
+    starts = bucket_starts(x, width)
+    if how == 'minmax':
+        kept = bucket_extremes(y, starts)
+        return [x[kept], y[kept]]
+    sizes = np.diff(np.append(starts, len(x)))
+    if how == 'ohlc':
+        return [x[starts], y[starts], np.fmax.reduceat(y, starts),
+                np.fmin.reduceat(y, starts), y[starts + sizes - 1]]
+    finite = np.isfinite(y)
+    counts = np.add.reduceat(finite.astype(np.intp), starts).astype(np.float64)
+    counts[counts == 0] = np.nan
+    mean_x = np.add.reduceat(x.astype(np.float64), starts) / sizes
+    if x.dtype.kind in 'iu':
+        mean_x = np.round(mean_x).astype(x.dtype)
+    return [mean_x, np.add.reduceat(np.where(finite, y, 0), starts) / counts]
+
+
+def build_levels(x, y, base_points=1000, factor=4, how='mean'):
+    """ (bucket width, columns) Per Level, From Coarsest To Raw
+
+    The coarsest level has about base_points buckets over the full range,
+    each further level factor times as many; levels stop once they would
+    hold more than 1 / factor of the raw points.
+    """
+    if how not in PYRAMID_METHODS:
+        raise ValueError("Pyramid Method Must Be One Of: %s" % (PYRAMID_METHODS,))
+    span = float(x[-1] - x[0])
+    levels = []
+    buckets = base_points
+    while span > 0 and buckets * factor < len(x):
+        width = span / buckets
+        levels.append((width, aggregate(x, y, width, how)))
+        buckets *= factor
+    raw = [x, y, y, y, y] if how == 'ohlc' else [x, y]
+    levels.append((span / max(len(x) - 1, 1), raw))
+    return levels
+
+
+def write_chunks(columns, directory, prefix, chunk_points):
+    """ Write columns As JSON Files Of chunk_points Points Each
+
+    Returns [first x, last x, file name] per chunk.
+    """
+    chunks = []
+    for i, start in enumerate(range(0, len(columns[0]), chunk_points)):
+        part = [column[start:start + chunk_points] for column in columns]
+        name = "%s_c%d.json" % (prefix, i)
+        with open(os.path.join(directory, name), 'wb') as chunk_file:
+            chunk_file.write("[%s]" % encode_points(part))
+        chunks.append([part[0][0].item(), part[0][-1].item(), name])
+    return chunks
+
+
+def loader(base, manifests, previous=None):
+    """ Chart load Event Body Starting The Zoom Loading (After previous) """
+    call = "(%s)(this, %s, %s);" % (PYRAMID_LOADER, json.dumps(base),
+                                     json.dumps(manifests))
+    if previous:
+        call = "(%s).call(this);\n%s" % (previous, call)
+    return "function () {\n%s\n}" % call
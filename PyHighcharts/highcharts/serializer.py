@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+""" PyHighcharts serializer.py
+Single pass serializer for the Highcharts option blocks.
+
+Fragments are handed to a write callable (list.append, file.write, ...)
+as soon as they are produced, so the cost of rendering a chart grows
+linearly with the number of series and points.
+"""
+from PyHighcharts.highcharts.highchart_types import OptionStore, SeriesOptions, XY_SERIES_TYPES
+from PyHighcharts.highcharts.encoders import is_array, encode_array, \
+    encode_binary, encode_binary_columns, encode_points, is_binary_encodable, binary_column, \
+    epoch_ms, round_values, content_digest, TIMESTAMP_MODES
+
+# Stdlib Imports
+import datetime, math
+from _abcoll import Iterable
+
+FORMAT_SPECIAL_CASES = {
+    "formatter": "formatter",
+    "labelFormatter": "formatter",
+    "pointStart": "skip_quotes",
+    "events": "skip_quotes",
+    "load": "skip_quotes",
+    "multiaxis": "multiaxis"
+}
+
+# Float options written with every digit: a rounded interval drifts
+# further from the true x values with every point
+EXACT_FLOAT_OPTIONS = ("pointStart", "pointInterval")
+
+BOOL_MAPPING = {
+    False: 'false',
+    True: 'true',
+}
+
+DATE_UTC = "Date.UTC({year},{month},{day},{hours},{minutes},{seconds},{millisec})"
+
+# Pairs a hoisted x vector with the y values of one series
+SHARED_X_HELPER = """function phcZip(x, y) {
+  var points = new Array(y.length), i;
+  for (i = 0; i < y.length; i++) { points[i] = [x[i], y[i]]; }
+  return points;
+}
+"""
+
+
+def date_utc(value):
+    """ Convert A datetime To A JS Date.UTC Call (JS Months Are 0-Based) """
+    utc = value.utctimetuple()
+    return DATE_UTC.format(year=utc[0], month=utc[1]-1, day=utc[2],
+                           hours=utc[3], minutes=utc[4], seconds=utc[5],
+                           millisec=value.microsecond/1000)
+
+
+class Serializer(object):
+    """ Writes Highcharts JS Fragments To A Callable """
+
+    def __init__(self, write, timestamps='utc', binary_threshold=None,
+                 delta_x=False, shared_x=None, sidecar=None, precision=None,
+                 decimals=None):
+        if timestamps not in TIMESTAMP_MODES:
+            raise ValueError("Unknown Timestamp Mode: %s" % timestamps)
+        self.write = write
+        self.timestamps = timestamps
+        self.date = epoch_ms if timestamps == 'epoch' else date_utc
+        # Series data arrays with at least binary_threshold points are
+        # written as typed array buffers (see encoders.encode_binary)
+        self.binary_threshold = binary_threshold
+        self.delta_x = delta_x
+        # SharedColumns whose x vectors are referenced by variable name
+        self.shared_x = shared_x
+        # SidecarFiles taking the data of numeric series out of the page
+        self.sidecar = sidecar
+        # Float y values are rounded to precision significant digits or
+        # to decimals places (a series may set its own)
+        self.precision = precision
+        self.decimals = decimals
+        # Type of the series being written (None outside of one)
+        self.series_type = None
+
+    def option(self, key, val, tab_depth=1):
+        """ Write A Single key: value Entry """
+        write = self.write
+        if key in FORMAT_SPECIAL_CASES:
+            self.special(key, val, tab_depth)
+        elif isinstance(val, OptionStore):
+            self.option(key, val.__options__(), tab_depth)
+        elif isinstance(val, dict):
+            write("\t%s: {\n" % key)
+            for subkey, subval in val.items():
+                self.option(subkey, subval, tab_depth=3)
+            write("\t\t},\n")
+        elif isinstance(val, Iterable) and not isinstance(val, str):
+            expr = self.binary(key, val)
+            if expr is not None:
+                write("%s%s: %s,\n" % ("\t"*tab_depth, key, expr))
+            else:
+                body = None
+                if is_array(val):
+                    body = self.encode(val) if key == 'data' else encode_array(val)
+                write("%s%s:[" % ("\t"*tab_depth, key))
+                write(self.array(val) if body is None else body)
+                write("],\n")
+        else:
+            write("%s%s: %s,\n" % ("\t"*tab_depth, key,
+                self.scalar(val, exact=key in EXACT_FLOAT_OPTIONS)))
+
+    def settings(self):
+        """ Everything Besides The Data That Shapes The Output """
+        return (self.timestamps, self.binary_threshold, self.delta_x,
+                self.sidecar, self.precision, self.decimals)
+
+    def binary_candidate(self, val):
+        """ Should This Series Data Be Written As Typed Array Buffers """
+        return (self.binary_threshold is not None and is_array(val) and
+                len(val) >= self.binary_threshold and is_binary_encodable(val))
+
+    def binary(self, key, val):
+        """ Typed Array Expression For Large Series Data, Else None """
+        if key != 'data' or not self.binary_candidate(val):
+            return None
+        return encode_binary(val, delta_x=self.delta_x)
+
+    def rounded(self, values):
+        """ y Values Rounded To The Current Precision """
+        return round_values(values, self.precision, self.decimals)
+
+    def encode(self, values):
+        """ encode_array For Series Data, Rounding All But The x Column
+
+        Two column data is [x, y] only for the XY_SERIES_TYPES; [low, high]
+        pairs of the range types are rounded whole.
+        """
+        if values.ndim == 2 and values.shape[1] == 2 and \
+                self.series_type is not None and \
+                self.series_type not in XY_SERIES_TYPES:
+            return encode_array(self.rounded(values))
+        if values.ndim == 2 and values.shape[1] > 1:
+            columns = [values[:, i] for i in range(values.shape[1])]
+            return encode_points(columns[:1] +
+                                 [self.rounded(column) for column in columns[1:]])
+        return encode_array(self.rounded(values))
+
+    def special(self, key, val, tab_depth):
+        """ Keys Listed In FORMAT_SPECIAL_CASES """
+        case = FORMAT_SPECIAL_CASES[key]
+        if case == "skip_quotes":
+            if isinstance(val, float):
+                val = self.scalar(val, exact=True)
+            self.write("\t"*tab_depth + "%s: %s,\n" % (key, val))
+        elif case == "formatter":
+            self.write("\t"*tab_depth + "%s: %s,\n" % (key, val.formatter))
+        elif case == "multiaxis":
+            for k, v in val.__options__().iteritems():
+                self.option(k, v, tab_depth=tab_depth+1)
+        else:
+            raise NotImplementedError
+
+    def scalar(self, val, exact=False):
+        """ JS Literal For A Single Value; exact writes floats with every
+        digit (str() keeps 12 significant digits in Python 2) """
+        if isinstance(val, datetime.datetime):
+            return str(self.date(val))
+        elif isinstance(val, bool):
+            return BOOL_MAPPING[val]
+        elif val is None:
+            return 'null'
+        elif isinstance(val, str):
+            # Need to keep string quotes
+            return "\'" + val + "\'"
+        elif isinstance(val, float) and (math.isnan(val) or math.isinf(val)):
+            return 'null'
+        elif isinstance(val, float) and exact:
+            return repr(float(val))
+        return str(val)
+
+    def point(self, item):
+        """ JS Literal For A Point Given As A Sequence """
+        new_items = []
+        for subitem in item:
+            if isinstance(subitem, datetime.datetime):
+                new_items.append(str(self.date(subitem)))
+            elif isinstance(subitem, bool):
+                new_items.append(BOOL_MAPPING[subitem])
+            elif isinstance(subitem, str):
+                new_items.append("\'" + subitem + "\'")
+            elif subitem is None or (isinstance(subitem, float) and
+                    (math.isnan(subitem) or math.isinf(subitem))):
+                new_items.append('null')
+            else:
+                new_items.append(str(subitem))
+        return "[%s]" % ",".join(new_items)
+
+    def array(self, val):
+        """ Comma Separated Body Of A JS Array """
+        new_vals = []
+        for item in val:
+            if isinstance(item, dict):
+                buf = ["{"]
+                nested = Serializer(buf.append, timestamps=self.timestamps)
+                for k, v in item.items():
+                    nested.option(k, v, tab_depth=0)
+                buf.append("}")
+                new_vals.append("".join(buf))
+            elif isinstance(item, Iterable) and not isinstance(item, str):
+                new_vals.append(self.point(item))
+            else:
+                new_vals.append(self.scalar(item))
+        return ",".join(new_vals)
+
+    def series(self, data):
+        """ Special Formatting For Series """
+        for data_set in data['data']:
+            self.series_object(data_set)
+            self.write(",")
+
+    def series_object(self, data_set):
+        """ One Series As A JS Object Literal """
+        write = self.write
+        digits = self.precision, self.decimals
+        if data_set.precision is not None or data_set.decimals is not None:
+            self.precision, self.decimals = data_set.precision, data_set.decimals
+        options = data_set.__options__()
+        self.series_type = options.get('type')
+        try:
+            write("{\n")
+            for key, val in options.items():
+                expr = None
+                if key == 'data' and self.sidecar is not None:
+                    expr = self.sidecar.data(data_set, self)
+                if expr is not None:
+                    write("\tdata: %s,\n" % expr)
+                elif key == 'data' and data_set.x is not None:
+                    self.xy_data(data_set.x, val, tab_depth=1)
+                else:
+                    self.option(key, val, tab_depth=1)
+            write("\t}")
+        finally:
+            self.precision, self.decimals = digits
+            self.series_type = None
+
+    def xy_data(self, x, y, tab_depth=1):
+        """ Series Data Kept As Separate x And y Columns
+
+        A 2-D y holds several values per point ([low, high], box plot
+        rows, ...), written after x as [x, a, b, ...].
+        """
+        name = self.shared_x.name(x) if self.shared_x is not None else None
+        y = self.rounded(y)
+        columns = [x, y]
+        if is_array(y) and y.ndim == 2:
+            name = None
+            columns = [x] + [y[:, i] for i in range(y.shape[1])]
+        if name is not None:
+            expr = "phcZip(%s, %s)" % (name, self.column(y))
+        elif all(self.binary_candidate(column) for column in columns):
+            expr = encode_binary_columns(columns, delta_x=self.delta_x)
+        else:
+            body = None
+            if all(is_array(column) for column in columns):
+                body = encode_points(columns)
+            if body is None:
+                body = self.array(zip(*columns))
+            expr = "[%s]" % body
+        self.write("%s%s: %s,\n" % ("\t"*tab_depth, 'data', expr))
+
+    def column(self, values, delta=False):
+        """ JS Expression For A 1-D Column Of Values """
+        if self.binary_candidate(values):
+            return "phcDecode([%s])" % binary_column(values, delta=delta)
+        body = encode_array(values) if is_array(values) else None
+        return "[%s]" % (self.array(values) if body is None else body)
+
+    def object(self, options):
+        """ A Nested Dict Of Options As A JS Object Literal """
+        self.write("{\n")
+        for key, val in options.items():
+            self.option(key, val, tab_depth=1)
+        self.write("\t}")
+
+    def block(self, option_type, data):
+        """ Write One Top Level Option Block """
+        write = self.write
+        if option_type == "colors":
+            write(str(data['colors']))
+        elif option_type == "series":
+            self.series(data)
+        elif option_type == "yAxis" and data.get('axis'):
+            write("[{\n")
+            for i, ax in enumerate(data['axis'], 1):
+                self.option('multiaxis', ax, tab_depth=1)
+                if not i == len(data['axis']):
+                    write("\t},{\n")
+            write("\t}]")
+        else:
+            write("{\n")
+            for key, val in data.items():
+                if isinstance(val, dict):
+                    write("\t%s: {\n" % key)
+                    for subkey, subval in val.items():
+                        self.option(subkey, subval, tab_depth=3)
+                    write("\t\t},\n")
+                elif isinstance(val, SeriesOptions):
+                    write("\t%s: {\n" % key)
+                    for subkey, subval in val.__options__().items():
+                        self.option(subkey, subval, tab_depth=3)
+                    write("\t\t},\n")
+                else:
+                    self.option(key, val, tab_depth=2)
+            write("\t}")
+
+
+def serialize(option_type, data, **settings):
+    """ Render One Option Block To A String """
+    buf = []
+    Serializer(buf.append, **settings).block(option_type, data)
+    return "".join(buf)
+
+
+class SharedColumns(object):
+    """ x Vectors Used By More Than One Series, Written Once As JS Variables
+
+    Vectors are matched by identity first and by dtype, shape and content
+    hash otherwise. Variable names derive from the hash, so the same vector
+    declared by several scripts on one page always holds the same value.
+    Only numeric and datetime64 vectors are shared; object arrays (strings,
+    Periods, ...) are written with each series.
+    """
+
+    # dtype kinds whose bytes identify the values
+    KINDS = 'biufM'
+
+    def __init__(self):
+        self.keys = {}      # id(x) -> (x, key); x is kept alive for the id
+        self.columns = {}   # key -> [x, number of series using it]
+        self.order = []
+
+    def key(self, x):
+        """ Identity Of x's Content """
+        known = self.keys.get(id(x))
+        if known is not None and known[0] is x:
+            return known[1]
+        key = content_digest([x])
+        self.keys[id(x)] = (x, key)
+        return key
+
+    def add(self, x):
+        """ Count One More Series Using x """
+        if not is_array(x) or x.dtype.kind not in self.KINDS:
+            return
+        key = self.key(x)
+        if key not in self.columns:
+            self.columns[key] = [x, 0]
+            self.order.append(key)
+        self.columns[key][1] += 1
+
+    def name(self, x):
+        """ JS Variable Holding x If It Is Shared, Else None """
+        if not is_array(x) or x.dtype.kind not in self.KINDS:
+            return None
+        key = self.key(x)
+        if self.columns.get(key, (None, 0))[1] < 2:
+            return None
+        return "phcX_%s" % key[:12]
+
+    def script(self, serializer):
+        """ Declarations Of Every Shared Vector ("" If None Is Shared) """
+        buf = []
+        for key in self.order:
+            x = self.columns[key][0]
+            name = self.name(x)
+            if name is not None:
+                buf.append("var %s = %s;\n" % (name,
+                    serializer.column(x, delta=serializer.delta_x)))
+        return SHARED_X_HELPER + "".join(buf) if buf else ""
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+""" PyHighcharts sidecar.py
+Series data written to content addressed JSON files next to the page.
+
+File names derive from a hash of the series arrays, so regenerating a
+page only encodes and writes the series whose data changed; the others
+are reused from disk, and browsers may cache them across page versions.
+
+Requires numpy.
+"""
+from PyHighcharts.highcharts.encoders import as_array, is_array, \
+    encode_points, content_digest, write_atomic
+from PyHighcharts.highcharts.highchart_types import XY_SERIES_TYPES
+
+# Stdlib Imports
+import os
+
+# Unwraps the results of $.when over one or more $.getJSON requests
+SIDECAR_LOADER = """function phcSidecar(results, count) {
+  var data = [], i;
+  if (count === 1) { return [results[0]]; }
+  for (i = 0; i < count; i++) { data.push(results[i][0]); }
+  return data;
+}
+"""
+
+
+def sidecar_columns(data_set):
+    """ Numeric Arrays Making Up The Series Data, Else None """
+    x, y = as_array(data_set.x), as_array(data_set.data)
+    columns = [y] if x is None else [x, y]
+    if not all(is_array(column) and column.dtype.kind in 'biufM'
+               for column in columns):
+        return None
+    if x is not None and (x.ndim != 1 or y.ndim != 1):
+        return None
+    if y.ndim not in (1, 2):
+        return None
+    return columns
+
+
+class SidecarFiles(object):
+    """ Writes Series Data To directory, Referenced From The Page By url """
+
+    def __init__(self, directory, url):
+        self.directory = directory
+        self.url = url
+        self.files = []
+
+    def key(self, columns, digits):
+        """ Content Hash Of The Data Columns Written With digits Precision """
+        return content_digest(columns, salt=repr(digits))
+
+    def data(self, data_set, serializer):
+        """ JS Expression For The Series Data Once Loaded, None If It Has To
+        Stay Inline; values are rounded as serializer would round them """
+        columns = sidecar_columns(data_set)
+        if columns is None:
+            return None
+        digits = (serializer.precision, serializer.decimals)
+        if columns[0].ndim == 2:
+            # Whether column 0 is an unrounded x depends on the type
+            digits += (serializer.series_type in XY_SERIES_TYPES,)
+        name = "%s.json" % self.key(columns, digits)[:16]
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            if len(columns) == 2:
+                body = encode_points([columns[0], serializer.rounded(columns[1])])
+            else:
+                body = serializer.encode(columns[0])
+            if body is None:
+                return None
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            write_atomic(path, "[%s]" % body)
+        self.files.append(name)
+        return "phcData[%d]" % (len(self.files) - 1)
+
+    def head(self):
+        """ Script Opening The Callback Run Once Every File Has Loaded """
+        if not self.files:
+            return ""
+        requests = ", ".join("$.getJSON('%s%s')" % (self.url, name)
+                             for name in self.files)
+        return "%s$.when(%s).done(function () {\nvar phcData = " \
+            "phcSidecar(arguments, %d);\n" % (SIDECAR_LOADER, requests,
+                                               len(self.files))
+
+    def tail(self):
+        """ Script Closing head() """
+        return "\n});\n" if self.files else ""
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+""" PyHighcharts templates.py
+Process wide registry of the chart templates.
+
+Each template file is read once, on first use, and kept pre-split into
+its static segments and placeholder slots. Set TEMPLATES.check_mtime to
+reload templates whose file changed on disk.
+"""
+# Stdlib Imports
+import os, string
+
+
+def split_template(tmp):
+    """ Split A str.format Template Into (literal, field name) Pairs """
+    return [(literal, field) for literal, field, _, _ in
+            string.Formatter().parse(tmp)]
+
+
+class Template(object):
+    """ A Template File Split Into Static Segments And Slots """
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, "rb") as template_file:
+            self.parts = split_template(template_file.read())
+
+    def stale(self):
+        """ True If The File Changed Since It Was Loaded """
+        return os.path.getmtime(self.path) != self.mtime
+
+
+class TemplateRegistry(object):
+    """ Lazily Loaded, Shared Templates Keyed By Path """
+
+    def __init__(self, check_mtime=False):
+        self.check_mtime = check_mtime
+        self.templates = {}
+
+    def get(self, path):
+        """ The Template At path, Loading It On First Use """
+        template = self.templates.get(path)
+        if template is None or (self.check_mtime and template.stale()):
+            template = self.templates[path] = Template(path)
+        return template
+
+    def clear(self):
+        """ Forget Every Loaded Template """
+        self.templates.clear()
+
+
+TEMPLATES = TemplateRegistry()
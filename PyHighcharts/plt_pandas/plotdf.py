@@ -2,6 +2,7 @@ import os.path
 import random
 import datetime
 import collections
+import warnings
 
 import numpy as np
 import pandas
@@ -9,9 +10,22 @@ import pandas
 from jinja2 import Template
 
 from PyHighcharts import Highstock, Highchart
+from PyHighcharts.highcharts.chart import localize_urls
+from PyHighcharts.highcharts.encoders import as_array, to_datetime64
+from PyHighcharts.highcharts.serializer import Serializer, SharedColumns
+from PyHighcharts.highcharts.compress import Outputs
 
 default_size = (900,900)
 
+# Box plot rows: low whisker, lower quartile, median, upper quartile, high whisker
+BOX_PERCENTILES = [0, 25, 50, 75, 100]
+
+# Bound on the LOWESS distance matrix size (evaluation points x points)
+LOWESS_BLOCK = 4000000
+
+# Grids of the scatter density mode
+DENSITY_GRIDS = ('rect', 'hex')
+
 def indent(text, indents=1):
     if not text or not isinstance(text, str):
         return ''
@@ -77,22 +91,39 @@ MULTICHART_TEMPLATE="""
     <div id="{{ chart.container }}" style="width: 100%;"></div>
 {% endfor %}
 
+{% if shared %}
+<script type='text/javascript'>
+{{ shared }}
+</script>
+{% endif %}
 {% for chart in charts %}
 <script type='text/javascript'>
-    {{ chart.data }}
+    {% for chunk in chart.chunks() %}{{ chunk }}{% endfor %}
 </script>
 {% endfor %}
 </body>
 </html>
 """
 class TemplateChart(object):
-    def __init__(self, idx, chart):
+    """Chart as seen by MULTICHART_TEMPLATE
+
+    The script is rendered only when the template reaches it and is not
+    kept afterwards, so a page never holds more than one chart's text.
+    """
+    def __init__(self, idx, chart, shared=None):
         self.chart = chart
         self.title = chart.title()
         self.idx = idx
         self.container = 'chart%d' % idx
         self.chart.options['chart'].renderTo = self.container
-        self.data = self.chart.generate()
+        self.shared = shared
+
+    def chunks(self):
+        return self.chart.iter_render(shared=self.shared)
+
+    @property
+    def data(self):
+        return self.chart.generate()
 
 class MultiChart(object):
     def __init__(self, charts=None):
@@ -104,22 +135,39 @@ class MultiChart(object):
     def addChart(self, chart):
         self.charts.append(chart)
 
-    def write(self, temp_dir='.', fname=None, localurl=False):
+    def write(self, temp_dir='.', fname=None, localurl=False, compress=(),
+              plain=True, bundle=None, asset_dir=None):
+        """Stream the page to a file one chart script at a time, returns filename
+
+        compress ('gzip', 'br' or both) also writes precompressed .gz / .br
+        siblings of the page as it is streamed; plain=False skips the
+        uncompressed file (the first compressed one is returned).
+
+        bundle ('inline' or 'reference') takes jQuery / Highcharts from
+        asset_dir instead of the CDN, see Highchart.write.
+        """
+        # x vectors repeated across series and charts are declared once
+        shared = SharedColumns()
+        for chart in self.charts:
+            chart.share_x(shared)
         template_charts = []
         for idx, chart in enumerate(self.charts):
-            template_charts.append(TemplateChart(idx, chart))
+            template_charts.append(TemplateChart(idx, chart, shared))
 
-        html = self.template.render(needs=self.charts[0].need(), charts=template_charts)
-        if localurl:
-            html = html.replace('https://ajax.googleapis.com/ajax/libs/jquery/1.7.2','/js')
-            html = html.replace('http://code.highcharts.com','/js')
+        needs = self.charts[0].headers(bundle, temp_dir, asset_dir)
+        if localurl and bundle is None:
+            # Bundled scripts are inlined or local already
+            needs = localize_urls(needs)
         if fname is None:
             new_filename = "%x.html" % (random.randint(pow(16, 5), pow(16, 6)-1))
         else:
             new_filename = fname
         new_fn = os.path.join(temp_dir, new_filename)
-        with open(new_fn, 'wb') as file_open:
-            file_open.write(html)
+        with Outputs(new_fn, compress=compress, plain=plain) as outputs:
+            for chunk in self.template.generate(needs=needs, charts=template_charts,
+                                                shared=shared.script(Serializer(None))):
+                outputs.write(chunk.encode('utf-8'))
+        return outputs.paths[0]
 
 otherparams = \
 """
@@ -133,6 +181,10 @@ otherparams = \
         Y-axis title
     size: tuple, option
         Tuple with (width, height)
+    precision: int, optional
+        Significant digits of the float values written
+    decimals: int, optional
+        Decimal places of the float values written (instead of precision)
 """
 
 def __getOptionUpdatesFromKwargs(kwargs):
@@ -145,17 +197,30 @@ def __getOptionUpdatesFromKwargs(kwargs):
         update(options, {'yAxis': {'title' : {'text': kwargs['y_title']}}})
     return options
 
+def __getDigits(kwargs):
+    """Return the precision / decimals chart keywords found in kwargs"""
+    return {key: kwargs[key] for key in ('precision', 'decimals') if key in kwargs}
+
 def __getIndex(index):
-    is_dates = False
+    """Return the index values and whether they are dates
+
+    A DatetimeIndex comes back as a view of its datetime64 buffer (UTC),
+    which every series shares without a copy; other dates are converted
+    once to datetime64.
+    """
     if isinstance(index, pandas.DatetimeIndex):
-        is_dates = True
-        index = index.to_pydatetime()
-    elif isinstance(index[0], datetime.date):
-        is_dates = True
-        index = [datetime.datetime(d.year,d.month,d.day) for d in index]
-    elif isinstance(index[0], datetime.date):
-        is_dates = True
-    return index, is_dates
+        return index.values, True
+    if isinstance(index[0], (datetime.date, np.datetime64)):
+        return to_datetime64(index), True
+    return as_array(index), False
+
+def __getColumns(df):
+    """Return the columns of df as one 2-D block of values, a view of the
+    frame's data when all columns share a dtype, else as a list of columns
+    """
+    if df.dtypes.nunique() == 1:
+        return df.values
+    return [data.values for _, data in df.iteritems()]
 
 @Appender(otherparams)
 def createBarChart(df, **kwargs):
@@ -170,9 +235,9 @@ def createBarChart(df, **kwargs):
 
     index = df.index
     size = kwargs.get('size', default_size)
-    H = Highchart(width=size[0], height=size[1], renderTo='container')
-    for colname, data in df.iteritems():
-        H.add_data_set(data.values, type='bar', name=colname)
+    H = Highchart(width=size[0], height=size[1], renderTo='container',
+                  **__getDigits(kwargs))
+    H.add_data_sets(__getColumns(df), names=list(df.columns), type='bar')
     options = {'chart': {'zoomType': 'x'}}
     update(options, {'xAxis': {'categories': index.tolist()}})
     update(options, __getOptionUpdatesFromKwargs(kwargs))
@@ -180,25 +245,92 @@ def createBarChart(df, **kwargs):
 
     return H
 
+def __getBoxStats(values, outliers=False, whis=1.5):
+    """Return the box plot rows [low, q1, median, q3, high] of the columns
+    of values, from one percentile pass, and the outliers of every column
+
+    With outliers the whiskers end at the furthest points within whis
+    interquartile ranges of the box (never inside the box) and the points
+    beyond are returned; otherwise the whiskers span the full range.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    with warnings.catch_warnings():
+        # All-NaN columns come back as NaN (null) rows
+        warnings.simplefilter('ignore', RuntimeWarning)
+        stats = np.nanpercentile(values, BOX_PERCENTILES, axis=0).T
+    found = []
+    if not outliers:
+        return stats, found
+    with np.errstate(invalid='ignore'):
+        for row, column in zip(stats, values.T):
+            reach = whis * (row[3] - row[1])
+            inside = (column >= row[1] - reach) & (column <= row[3] + reach)
+            if inside.any():
+                row[0] = min(column[inside].min(), row[1])
+                row[4] = max(column[inside].max(), row[3])
+            found.append(column[~inside & ~np.isnan(column)])
+    return stats, found
+
+def __addOutliers(H, found, name):
+    """Add the outliers of each box as a scatter series at its category"""
+    counts = [len(points) for points in found]
+    if not sum(counts):
+        return
+    x = np.repeat(np.arange(len(found)), counts)
+    y = np.concatenate(found)
+    H.add_data_set(y, x=x, type='scatter', name=name, detect_interval=False)
+
 @Appender(otherparams)
-def createBoxChart(df, **kwargs):
+def createBoxChart(df, by=None, outliers=False, whis=1.5, **kwargs):
     """Create box chart from DataFrame
 
     Parameters
     ----------
     df : pandas.DataFrame
         DataFrame with data
+    by : column name or list of column names, optional
+        Group the rows by these columns: one box series per numeric
+        column, with a box for every group
+    outliers : bool, optional
+        End the whiskers at the furthest points within whis interquartile
+        ranges of the box and draw the points beyond as a scatter series,
+        False by default (whiskers span the full range)
+    whis : float, optional
+        Whisker reach in interquartile ranges when outliers is set, 1.5
+        by default
     
     """
 
     size = kwargs.get('size', default_size)
-    H = Highchart(width=size[0], height=size[1], renderTo='container')
-    df = df.dropna(axis=1, how='all')
-    boxdata = pandas.DataFrame({'min': df.min(), 'max': df.max(), '0.25': df.quantile(0.25), '0.75': df.quantile(0.75), 'median': df.median()})
-    boxdata = boxdata.reindex(columns=['min', '0.25', 'median', '0.75', 'max'])
-    H.add_data_set(boxdata.values.tolist(), type='boxplot', name='Observations')
+    H = Highchart(width=size[0], height=size[1], renderTo='container',
+                  **__getDigits(kwargs))
+    keys = [] if by is None else [by] if np.isscalar(by) else list(by)
+    numeric = df.drop(keys, axis=1).select_dtypes(include=[np.number])
+    if by is None:
+        numeric = numeric.dropna(axis=1, how='all')
+        stats, found = __getBoxStats(numeric.values, outliers, whis)
+        categories = numeric.columns.tolist()
+        H.add_data_set(stats, x=np.arange(len(stats)), type='boxplot',
+                       name='Observations', detect_interval=False)
+        if outliers:
+            __addOutliers(H, found, 'Outliers')
+    else:
+        groups = numeric.groupby([df[key] for key in keys], sort=True)
+        categories, boxes = [], []
+        for group, frame in groups:
+            categories.append(', '.join(str(key) for key in group)
+                              if isinstance(group, tuple) else group)
+            boxes.append(__getBoxStats(frame.values, outliers, whis))
+        x = np.arange(len(boxes))
+        for i, colname in enumerate(numeric.columns):
+            stats = np.array([box[0][i] for box in boxes]).reshape(-1, 5)
+            H.add_data_set(stats, x=x, type='boxplot', name=colname,
+                           detect_interval=False)
+            if outliers:
+                __addOutliers(H, [box[1][i] for box in boxes],
+                              '%s Outliers' % colname)
     options = {'chart': {'zoomType': 'x', 'type': 'boxplot'}}
-    update(options, {'xAxis': {'categories': boxdata.index.tolist()}})
+    update(options, {'xAxis': {'categories': categories}})
     update(options, __getOptionUpdatesFromKwargs(kwargs))
     H.set_options(options)
 
@@ -216,9 +348,9 @@ def createColumnChart(df, **kwargs):
     """
     index = df.index
     size = kwargs.get('size', default_size)
-    H = Highchart(width=size[0], height=size[1], renderTo='container')
-    for colname, data in df.iteritems():
-        H.add_data_set(data, type='column', name=colname)
+    H = Highchart(width=size[0], height=size[1], renderTo='container',
+                  **__getDigits(kwargs))
+    H.add_data_sets(__getColumns(df), names=list(df.columns), type='column')
     options = {'chart': {'zoomType': 'x'}}
     update(options, {'xAxis': {'categories': index.tolist()}})
     update(options, __getOptionUpdatesFromKwargs(kwargs))
@@ -234,15 +366,28 @@ def createLineChart(df, **kwargs):
     ----------
     df : pandas.DataFrame
         DataFrame with data
+    max_points : int, optional
+        Downsample columns longer than this many points
+    downsample : {'lttb', 'minmax'}, optional
+        Downsampling method, 'lttb' (largest triangle three buckets)
+        by default
+    detect_interval : bool, optional
+        Write a regularly spaced index as pointStart / pointInterval
+        instead of per point x values, True by default
     
     """
     index, is_dates = __getIndex(df.index)
+    max_points = kwargs.get('max_points', None)
+    method = kwargs.get('downsample', 'lttb')
+    detect_interval = kwargs.get('detect_interval', True)
 
     size = kwargs.get('size', default_size)
-    H = Highchart(width=size[0], height=size[1], renderTo='container')
+    H = Highchart(width=size[0], height=size[1], renderTo='container',
+                  **__getDigits(kwargs))
 
-    for colname, data in df.iteritems():
-        H.add_data_set(zip(index, data), type='line', name=colname)
+    H.add_data_sets(__getColumns(df), names=list(df.columns), x=index,
+                    type='line', max_points=max_points, downsample=method,
+                    detect_interval=detect_interval)
     options = {'chart': {'zoomType': 'x'}}
     if is_dates:
         update(options, {'xAxis': {'type': 'datetime'}})
@@ -259,15 +404,28 @@ def createStockChart(df, **kwargs):
     ----------
     df : pandas.DataFrame
         DataFrame with data
+    max_points : int, optional
+        Downsample columns longer than this many points
+    downsample : {'lttb', 'minmax'}, optional
+        Downsampling method, 'lttb' (largest triangle three buckets)
+        by default
+    detect_interval : bool, optional
+        Write a regularly spaced index as pointStart / pointInterval
+        instead of per point x values, True by default
     
     """
     index, is_dates = __getIndex(df.index)
+    max_points = kwargs.get('max_points', None)
+    method = kwargs.get('downsample', 'lttb')
+    detect_interval = kwargs.get('detect_interval', True)
 
     size = kwargs.get('size', default_size) 
-    H = Highstock(width=size[0], height=size[1], renderTo='container')
+    H = Highstock(width=size[0], height=size[1], renderTo='container',
+                  **__getDigits(kwargs))
 
-    for colname, data in df.iteritems():
-        H.add_data_set(zip(index, data), type='line', name=colname)
+    H.add_data_sets(__getColumns(df), names=list(df.columns), x=index,
+                    type='line', max_points=max_points, downsample=method,
+                    detect_interval=detect_interval)
     options = {'chart': {'zoomType': 'x'}, 
                'legend': {'enabled': True},
                'tooltip': {'shared': False},
@@ -279,6 +437,136 @@ def createStockChart(df, **kwargs):
 
     return H
 
+def __fitLine(x, y, weights=None):
+    """Return the intercept and slope of the (weighted) least squares line
+    of y on x and its R squared, in closed form"""
+    if weights is None:
+        weights = np.ones(len(x))
+    total = weights.sum()
+    x_mean, y_mean = weights.dot(x) / total, weights.dot(y) / total
+    dx, dy = x - x_mean, y - y_mean
+    wdx = weights * dx
+    sxx, sxy, syy = wdx.dot(dx), wdx.dot(dy), (weights * dy).dot(dy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / sxx
+        rsquared = sxy * sxy / (sxx * syy)
+    return y_mean - slope * x_mean, slope, rsquared
+
+def __fitRobustLine(x, y, tuning=1.345, iterations=50, tol=1e-8):
+    """Return the intercept and slope of the Huber M-estimate line of y on
+    x, fit by iteratively reweighted least squares"""
+    a, b, _ = __fitLine(x, y)
+    for _ in range(iterations):
+        residuals = y - a - b * x
+        # Residual scale: median absolute deviation
+        scale = np.median(np.abs(residuals - np.median(residuals))) / 0.6745
+        if not scale > 0:
+            break
+        weights = np.minimum(1, tuning * scale / np.maximum(np.abs(residuals), 1e-300))
+        new_a, new_b, _ = __fitLine(x, y, weights)
+        done = abs(new_a - a) <= tol * (1 + abs(a)) and abs(new_b - b) <= tol * (1 + abs(b))
+        a, b = new_a, new_b
+        if done:
+            break
+    return a, b
+
+def __lowess(x, y, xvals, frac=2./3):
+    """Return the LOWESS fit of y on x at xvals: local lines weighted by
+    the tricube of the distance over the nearest frac of the points"""
+    k = min(len(x), max(int(np.ceil(frac * len(x))), 2))
+    fitted = np.empty(len(xvals))
+    # Evaluation points per block, bounding the distance matrix size
+    step = max(1, LOWESS_BLOCK // len(x))
+    for start in range(0, len(xvals), step):
+        x0 = xvals[start:start + step, None]
+        distances = np.abs(x - x0)
+        reach = np.partition(distances, k - 1, axis=1)[:, k - 1:k]
+        # Tricube in place, multiplications being far cheaper than **3
+        scaled = np.divide(distances, np.maximum(reach, np.finfo(float).tiny), out=distances)
+        weights = scaled * scaled
+        weights *= scaled
+        np.subtract(1, weights, out=weights)
+        np.clip(weights, 0, 1, out=weights)
+        np.multiply(weights, weights * weights, out=weights)
+        total = weights.sum(axis=1)
+        x_mean, y_mean = weights.dot(x) / total, weights.dot(y) / total
+        dx = x - x_mean[:, None]
+        wdx = weights * dx
+        sxx, sxy = (wdx * dx).sum(axis=1), wdx.dot(y) - y_mean * wdx.sum(axis=1)
+        slope = np.where(sxx > 0, sxy / np.where(sxx > 0, sxx, 1), 0)
+        fitted[start:start + step] = y_mean + slope * (x0[:, 0] - x_mean)
+    return fitted
+
+def __gridSteps(x, y, nx, ny):
+    """Return the origin and the cell size along x and y of an nx by ny grid
+    spanning the points"""
+    xmin, ymin = x.min(), y.min()
+    sx, sy = (x.max() - xmin) / float(nx), (y.max() - ymin) / float(ny)
+    return xmin, ymin, sx or 1.0, sy or 1.0
+
+def __binRect(x, y, bins):
+    """Return the cell of every point in a rectangular grid of bins (an int
+    or an (nx, ny) pair) cells and the centres of all the cells"""
+    nx, ny = (bins, bins) if np.isscalar(bins) else bins
+    xmin, ymin, sx, sy = __gridSteps(x, y, nx, ny)
+    ix = np.clip(((x - xmin) / sx).astype(np.intp), 0, nx - 1)
+    iy = np.clip(((y - ymin) / sy).astype(np.intp), 0, ny - 1)
+    centres = np.indices((nx, ny)).reshape(2, -1) + 0.5
+    return ix * ny + iy, xmin + centres[0] * sx, ymin + centres[1] * sy
+
+def __binHex(x, y, bins):
+    """Return the cell of every point in a hexagonal grid bins hexagons
+    wide (or an (nx, ny) pair) and the centres of all the cells
+
+    The hexagon centres form two offset rectangular lattices; every point
+    goes to the nearest centre of either.
+    """
+    nx, ny = (bins, max(int(bins / np.sqrt(3)), 1)) if np.isscalar(bins) else bins
+    xmin, ymin, sx, sy = __gridSteps(x, y, nx, ny)
+    ix, iy = (x - xmin) / sx, (y - ymin) / sy
+    ix1, iy1 = np.round(ix).astype(np.intp), np.round(iy).astype(np.intp)
+    ix2 = np.clip(np.floor(ix).astype(np.intp), 0, nx - 1)
+    iy2 = np.clip(np.floor(iy).astype(np.intp), 0, ny - 1)
+    first = (ix - ix1)**2 + 3 * (iy - iy1)**2 < \
+        (ix - ix2 - 0.5)**2 + 3 * (iy - iy2 - 0.5)**2
+    cells = np.where(first, ix1 * (ny + 1) + iy1,
+                     (nx + 1) * (ny + 1) + ix2 * ny + iy2)
+    outer = np.indices((nx + 1, ny + 1)).reshape(2, -1).astype(np.float64)
+    inner = np.indices((nx, ny)).reshape(2, -1) + 0.5
+    centres = np.concatenate((outer, inner), axis=1)
+    return cells, xmin + centres[0] * sx, ymin + centres[1] * sy
+
+def __densitySample(cells, counts, size, seed=0):
+    """Return the indices, in order, of a weighted reservoir sample of size
+    points, each weighing the inverse of its cell's count (A-Res), so that
+    the points of sparse cells (outliers) are favoured"""
+    if size >= len(cells):
+        return np.arange(len(cells))
+    uniform = np.random.RandomState(seed).random_sample(len(cells))
+    # log(u ** (1 / weight)): the size largest keys form the sample
+    keys = np.log(uniform) * counts[cells]
+    return np.sort(np.argpartition(keys, len(keys) - size)[len(keys) - size:])
+
+def __addDensity(H, x, y, name, density, bins, sample, seed):
+    """Add the points binned into a bubble series sized by count, and
+    optionally a sample of them drawn over it"""
+    if density not in DENSITY_GRIDS:
+        raise ValueError('density should be one of %s' % (DENSITY_GRIDS,))
+    binner = __binHex if density == 'hex' else __binRect
+    cells, centres_x, centres_y = binner(x, y, bins)
+    counts = np.bincount(cells, minlength=len(centres_x))
+    filled = np.flatnonzero(counts)
+    size = bins if np.isscalar(bins) else max(bins)
+    H.add_data_set(np.column_stack((centres_y[filled], counts[filled])),
+                   x=centres_x[filled], series_type='bubble', type='bubble',
+                   name=name, detect_interval=False, minSize=1,
+                   maxSize='%g%%' % (100.0 / size))
+    if sample:
+        kept = __densitySample(cells, counts, sample, seed)
+        H.add_data_set(y[kept], x=x[kept], series_type='scatter', type='scatter',
+                       name='%s sample' % name, detect_interval=False,
+                       marker={'radius': 2})
+
 @Appender(otherparams)
 def createScatterChart(df, pairs=None, **kwargs):
     """Scatter plot pairs of columns of given DataFrame
@@ -290,14 +578,31 @@ def createScatterChart(df, pairs=None, **kwargs):
     pairs : dict
         Dict mapping names to pairs (tuples) of columns names
         in df.  This describes each series that will be plotted
-    ref : If it is not None, then construct a regression line through
-          first pair for reference.  If a tuple of size two is passed,
-          it is treated as the (intercept, slope) of a line, otherwise
-          OLS is used to determine the intercept and slope
+    ref : If it is not None, then draw a reference line through every
+          pair.  If a tuple of size two is passed, it is treated as the
+          (intercept, slope) of a line; 'robust' fits a Huber regression
+          line, 'lowess' a LOWESS curve and anything else an OLS line
+          (with its R squared in the name)
+    frac : float, optional
+        Fraction of the points weighing in each LOWESS estimate, 2/3 by
+        default
+    density : {'rect', 'hex'}, optional
+        Bin the points into a rectangular or hexagonal grid and draw one
+        bubble per non empty cell, sized by its count, instead of every
+        point
+    bins : int or tuple, optional
+        Grid size, cells along x (or an (nx, ny) pair) for density, 50 by
+        default
+    sample : int, optional
+        Also draw this many raw points over the density bubbles, sampled
+        in favour of sparse cells (outliers)
+    seed : int, optional
+        Random seed of the sample, 0 by default
 
     """
     size = kwargs.get('size', default_size)
-    H = Highchart(width=size[0], height=size[1], renderTo='container')
+    H = Highchart(width=size[0], height=size[1], renderTo='container',
+                  **__getDigits(kwargs))
     if pairs is None:
         pairs = {'data': (df.columns[0], df.columns[1])}
     if isinstance(pairs, dict):
@@ -305,23 +610,40 @@ def createScatterChart(df, pairs=None, **kwargs):
     else:
         data = pairs
     ref = kwargs.get('ref', None)
+    if isinstance(ref, tuple) and len(ref) != 2:
+        raise ValueError('Tuple should be of size 2')
+    density = kwargs.get('density', None)
     for name, (x,y) in data:
-        H.add_data_set(zip(df[x], df[y]), type='scatter', name=name)
-        if ref is not None:
-            xvals = np.linspace(min(df[x]), max(df[x]), 100)
-            if isinstance(ref, tuple):
-                if len(ref) != 2:
-                    raise ValueError('Tuple should be of size 2')
-                (a,b) = ref
-                yvals = a + xvals * b 
-                H.add_data_set(zip(xvals,yvals), type='spline', name='%s = %.3f + %.3f %s' % (y, a, b, x))
-            else:
-                import statsmodels.api as sm
-                result = sm.OLS(df[y], sm.add_constant(df[[x]])).fit()
-                params = result.params
-                (a,b) = params['const'], params[x]
-                yvals = a + xvals * b 
-                H.add_data_set(zip(xvals,yvals), type='spline', name='%s = %.3f + %.3f %s (%.2f %%)' % (y, a, b, x, 100*result.rsquared))
+        xcol, ycol = df[x].values, df[y].values
+        if density is None:
+            H.add_data_set(ycol, x=xcol, type='scatter', name=name)
+        if ref is None and density is None:
+            continue
+        finite = np.isfinite(xcol) & np.isfinite(ycol)
+        xcol, ycol = xcol[finite].astype(np.float64), ycol[finite].astype(np.float64)
+        if not len(xcol):
+            continue
+        if density is not None:
+            __addDensity(H, xcol, ycol, name, density, kwargs.get('bins', 50),
+                         kwargs.get('sample', None), kwargs.get('seed', 0))
+        if ref is None:
+            continue
+        xvals = np.linspace(xcol.min(), xcol.max(), 100)
+        if isinstance(ref, tuple):
+            (a,b) = ref
+            label = '%s = %.3f + %.3f %s' % (y, a, b, x)
+        elif ref == 'robust':
+            (a,b) = __fitRobustLine(xcol, ycol)
+            label = '%s = %.3f + %.3f %s (robust)' % (y, a, b, x)
+        elif ref == 'lowess':
+            H.add_data_set(__lowess(xcol, ycol, xvals, kwargs.get('frac', 2./3)),
+                           x=xvals, type='spline', name='%s ~ %s (lowess)' % (y, x))
+            continue
+        else:
+            (a,b,rsquared) = __fitLine(xcol, ycol)
+            label = '%s = %.3f + %.3f %s (%.2f %%)' % (y, a, b, x, 100*rsquared)
+        yvals = a + xvals * b
+        H.add_data_set(yvals, x=xvals, type='spline', name=label)
 
     options = {'chart': {'zoomType': 'xy'}}
     update(options, __getOptionUpdatesFromKwargs(kwargs))